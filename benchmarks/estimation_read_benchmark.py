@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.report_storage import read_estimation_frame
+
+# Usage: python estimation_read_benchmark.py [path\to\US-EnzymedicaSalesReport.csv]
+# Without a path a synthetic three year report with the full cleaned column set is generated.
+
+COLUMNS = [
+    'date', 'time', 'weekday', 'settlement_id', 'type', 'order_id', 'sku', 'ASIN', 'description',
+    'quantity', 'marketplace', 'account_type', 'fulfillment', 'order_city', 'order_state', 'order_postal',
+    'tax_collection_model', 'product_sales', 'product_sales_tax', 'shipping_credits',
+    'shipping_credits_tax', 'gift_wrap_credits', 'giftwrap_credits_tax', 'Regulatory_Fee',
+    'Tax_On_Regulatory_Fee', 'promotional_rebates', 'promotional_rebates_tax', 'marketplace_withheld_tax',
+    'selling_fees', 'fba_fees', 'other_transaction_fees', 'other', 'total'
+]
+
+
+def build_synthetic_report(path, rows_per_day=1500, days=3 * 365):
+    rng = np.random.default_rng(0)
+    n = rows_per_day * days
+    dates = pd.date_range("2022-01-01", periods=days).repeat(rows_per_day)
+    df = pd.DataFrame({col: rng.normal(20, 5, n).round(2) for col in COLUMNS})
+    df['date'] = dates.strftime('%Y-%m-%d')
+    df['time'] = '10:15:00'
+    df['weekday'] = dates.day_name()
+    for col in ['settlement_id', 'type', 'order_id', 'sku', 'ASIN', 'marketplace', 'account_type',
+                'fulfillment', 'order_state', 'tax_collection_model']:
+        df[col] = rng.integers(0, 500, n).astype(str)
+    df['description'] = "Digest Gold with ATPro, Digestive Enzymes, 90 capsules " + df['sku']
+    df['order_city'] = "SANTA CLARITA"
+    df['order_postal'] = "91355-1234"
+    df.to_csv(path, index=False)
+
+
+def legacy_read(path):
+    df = pd.read_csv(path)
+    df['date'] = pd.to_datetime(df['date'])
+    df_day_sales = df[['date', 'time', 'weekday', 'sku', 'description', 'product_sales']].copy()
+    df_day_sales['product_sales'] = df_day_sales['product_sales'].astype(float)
+    df_day_sales['weekday'] = df_day_sales['date'].dt.day_name()
+    return df_day_sales
+
+
+def best_of(func, path, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        report_path = sys.argv[1]
+    else:
+        report_path = os.path.join(tempfile.gettempdir(), "synthetic-sales-report.csv")
+        if not os.path.exists(report_path):
+            build_synthetic_report(report_path)
+
+    size_mb = os.path.getsize(report_path) / 1024 ** 2
+    legacy = best_of(legacy_read, report_path)
+    projected = best_of(read_estimation_frame, report_path)
+
+    print(f"Report: {report_path} ({size_mb:,.1f} MB)")
+    print(f"Full read + inference:   {legacy:.2f}s")
+    print(f"Projected, pinned dtypes: {projected:.2f}s")
+    print(f"Speed-up: {legacy / projected:.1f}x")
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.locale_numbers import parse_localized_numbers
+
+# Usage: python eu_numeric_parse_benchmark.py [rows]
+# Builds a synthetic multi-year EU master with German-formatted amounts and
+# times the legacy three-pass string pipeline against parse_localized_numbers.
+
+NUMERICAL_COLUMNS = [
+    'quantity', 'product_sales', 'product_sales_tax', 'shipping_credits',
+    'shipping_credits_tax', 'gift_wrap_credits', 'giftwrap_credits_tax',
+    'promotional_rebates', 'promotional_rebates_tax', 'marketplace_withheld_tax',
+    'selling_fees', 'fba_fees', 'other_transaction_fees', 'other', 'total'
+]
+
+
+def german(amounts):
+    """Format floats the way the German report does: 1.234,56."""
+    text = pd.Series(amounts).map('{:,.2f}'.format)
+    return text.str.replace(',', '_', regex=False).str.replace('.', ',', regex=False).str.replace('_', '.', regex=False)
+
+
+def build_synthetic_master(rows):
+    rng = np.random.default_rng(0)
+    prices = rng.uniform(9, 120, 300).round(2)
+    quantity = rng.choice([1, 1, 1, 2, 3], rows)
+    sales = prices[rng.integers(0, len(prices), rows)] * quantity
+    columns = {}
+    for col in NUMERICAL_COLUMNS:
+        if col == 'quantity':
+            values = pd.Series(quantity.astype(str))
+        elif col in ('product_sales', 'total'):
+            values = german(sales)
+        else:
+            values = german((sales * rng.choice([0, 0.07, 0.15, 0.19], rows)).round(2))
+        columns[col] = values
+    df = pd.DataFrame(columns)
+    # A sprinkle of blanks like refunds and adjustments have.
+    df.loc[rng.random(rows) < 0.01, 'shipping_credits'] = np.nan
+    return df
+
+
+def legacy_parse(df):
+    out = {}
+    for col in NUMERICAL_COLUMNS:
+        text = df[col].astype(str).str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+        out[col] = pd.to_numeric(text, errors='coerce')
+    return pd.DataFrame(out)
+
+
+def fast_parse(df):
+    return pd.DataFrame({col: parse_localized_numbers(df[col]) for col in NUMERICAL_COLUMNS})
+
+
+def best_of(func, df, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 3 * 365 * 1500
+    master = build_synthetic_master(rows)
+
+    legacy, expected = best_of(legacy_parse, master)
+    fast, actual = best_of(fast_parse, master)
+    pd.testing.assert_frame_equal(expected, actual)
+
+    print(f"Rows: {rows:,} x {len(NUMERICAL_COLUMNS)} amount columns")
+    print(f"Legacy string pipeline:  {legacy:.2f}s")
+    print(f"parse_localized_numbers: {fast:.2f}s")
+    print(f"Speed-up: {legacy / fast:.1f}x (results identical)")
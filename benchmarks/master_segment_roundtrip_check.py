@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.master_store import MasterStore
+from common.locale_numbers import parse_localized_numbers
+
+# Usage: python master_segment_roundtrip_check.py
+# Appends a German-style report (preamble, an integer column with blanks,
+# decimal-comma amounts, zero-padded postal codes) to a master in CSV and in
+# Parquet mode and checks that every value reads back as the report's text,
+# so locale parsing sees exactly what Seller Central wrote.
+
+PREAMBLE = "".join(f'"Einschließlich Transaktionen bis {i}"\n' for i in range(7))
+REPORT_BODY = (
+    "Datum/Uhrzeit,Typ,Menge,Postleitzahl,Umsätze,Gesamt\n"
+    '01.03.2025 10:00:00 UTC,Bestellung,1,01067,"1.234,56","1.000,00"\n'
+    "01.03.2025 11:00:00 UTC,Übertrag,,,\"0,00\",\"-12,50\"\n"
+    '02.03.2025 09:30:00 UTC,Bestellung,2,80331,"19,99","15,10"\n'
+)
+
+
+def check(storage_format, folder):
+    report_file = os.path.join(folder, f"2025Mar1-2025Mar2CustomTransaction_{storage_format}.csv")
+    with open(report_file, "w", encoding="utf-8") as f:
+        f.write(PREAMBLE + REPORT_BODY)
+
+    store = MasterStore(os.path.join(folder, f"Master_{storage_format}.csv"), storage_format=storage_format)
+    store.append_report(report_file, skiprows=7)
+
+    expected = pd.read_csv(report_file, skiprows=7, dtype=str)
+    actual = store.read(dtype=str)
+    pd.testing.assert_frame_equal(expected, actual)
+
+    quantities = parse_localized_numbers(actual["Menge"]).tolist()
+    assert quantities[0] == 1 and quantities[2] == 2 and pd.isna(quantities[1]), quantities
+    if storage_format == "csv":
+        with open(store.segment_paths()[0], encoding="utf-8") as f:
+            assert f.read() == REPORT_BODY, "CSV segment differs from the report body"
+    print(f"{storage_format}: report text survives the master round trip (Menge = {quantities})")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        for storage_format in ("csv", "parquet"):
+            check(storage_format, folder)
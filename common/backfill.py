@@ -0,0 +1,35 @@
+import logging
+import pandas as pd
+from common.weekday_averages import rolling_cascading_weekday_averages
+from common.panel_estimation import month_end_estimates
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_estimates(daily_sales, start_date, end_date):
+    """Month-end estimates for every report date from start_date to end_date.
+
+    daily_sales is a Series of daily totals indexed by date. Each report date
+    follows the month-end rules of common.panel_estimation, like the daily
+    run. Actuals come from per-month running totals and the averages from
+    rolling per-weekday windows, so the history is scanned once for the
+    whole range.
+    """
+    report_dates = pd.date_range(start_date, end_date)
+    if report_dates.empty:
+        return {}
+    cutoffs = report_dates + pd.Timedelta(days=1)
+
+    weekday_avgs = rolling_cascading_weekday_averages(daily_sales, cutoffs)
+
+    daily_sales = daily_sales.groupby(pd.DatetimeIndex(daily_sales.index)).sum()
+    calendar = pd.date_range(report_dates[0].replace(day=1), report_dates[-1])
+    calendar_sales = daily_sales.reindex(calendar, fill_value=0.0)
+    month_to_date = calendar_sales.groupby(calendar.to_period('M')).cumsum()
+    actuals = month_to_date.reindex(report_dates).to_numpy()
+
+    rows = month_end_estimates(actuals, weekday_avgs, cutoffs, index=report_dates.strftime("%Y-%m-%d"))
+    estimates = rows.to_dict(orient='index')
+
+    logger.info(f"Computed {len(estimates)} backfill estimates from {report_dates[0].date()} to {report_dates[-1].date()}.")
+    return estimates
@@ -0,0 +1,103 @@
+import atexit
+import logging
+import threading
+import requests
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from selenium.webdriver.common.by import By
+from common.http_download import seed_http_session
+
+logger = logging.getLogger(__name__)
+
+# Seller Central region each marketplace logs in through.
+NA = "NA"  # sellercentral.amazon.com
+EU = "EU"  # sellercentral.amazon.de
+
+
+def account_switcher_url(login_url):
+    """Full-page account switcher on the same Seller Central host as login_url."""
+    parts = urlparse(login_url)
+    return f"{parts.scheme}://{parts.netloc}/account-switcher/default/merchantMarketplace"
+
+
+def is_signed_in(driver):
+    """Cheap probe of the page just loaded: Seller Central bounces expired sessions to sign-in."""
+    return "/ap/signin" not in driver.current_url and not driver.find_elements(By.ID, "ap_email")
+
+
+class BrowserSession:
+    """One Chrome instance plus what we know about its Seller Central state."""
+
+    def __init__(self, region, driver):
+        self.region = region
+        self.driver = driver
+        self.authenticated = False
+        self.marketplace = None
+        self.http = None
+
+    def set_download_dir(self, path):
+        """Point downloads at path, since marketplaces sharing a session save to different folders."""
+        self.driver.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "allow", "downloadPath": path})
+
+    def http_session(self):
+        """requests.Session carrying this browser's current cookies, reused so connections stay pooled."""
+        if self.http is None:
+            self.http = requests.Session()
+        return seed_http_session(self.http, self.driver)
+
+    def quit(self):
+        if self.http is not None:
+            self.http.close()
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Failed to quit {self.region} browser session: {e}")
+
+
+class BrowserSessionPool:
+    """Keeps one logged-in Chrome per Seller Central region for the life of the process.
+
+    Marketplaces in the same region take turns on that session and switch
+    accounts instead of starting a new browser and logging in again. A session
+    that fails mid-use is discarded so the next attempt starts clean.
+    """
+
+    def __init__(self):
+        self.sessions = {}
+        self.locks = {}
+        self.guard = threading.Lock()
+
+    def region_lock(self, region):
+        with self.guard:
+            return self.locks.setdefault(region, threading.Lock())
+
+    @contextmanager
+    def session(self, region, setup_driver):
+        """Borrow the region's session, starting Chrome with setup_driver() if there is none."""
+        with self.region_lock(region):
+            session = self.sessions.get(region)
+            if session is None:
+                logger.info(f"Starting a new {region} browser session...")
+                session = BrowserSession(region, setup_driver())
+                self.sessions[region] = session
+            else:
+                logger.info(f"Reusing {region} browser session (last marketplace: {session.marketplace}).")
+            try:
+                yield session
+            except BaseException:
+                self.discard(region)
+                raise
+
+    def discard(self, region):
+        session = self.sessions.pop(region, None)
+        if session is not None:
+            logger.info(f"Closing {region} browser session.")
+            session.quit()
+
+    def close_all(self):
+        for region in list(self.sessions):
+            self.discard(region)
+
+
+browser_pool = BrowserSessionPool()
+atexit.register(browser_pool.close_all)
@@ -0,0 +1,37 @@
+import os
+import logging
+import pandas as pd
+from common.report_storage import SalesReportWriter
+from common.daily_aggregates import aggregate_daily, merge_daily
+
+logger = logging.getLogger(__name__)
+
+# Rows per chunk when cleaning the master in streaming mode. 0 reads the
+# whole master at once, which is faster while the history still fits in memory.
+CHUNK_ROWS = int(os.getenv("SALES_CLEANING_CHUNK_ROWS", "0"))
+
+
+def clean_master_in_chunks(master_store, clean, output_path, daily_store, chunk_rows, **read_kwargs):
+    """Clean the master history chunk by chunk and append each chunk to the cleaned report.
+
+    clean is the cleaner's per-block step (rename, parse, map) and must work
+    on any slice of the master. Peak memory follows chunk_rows rather than
+    the length of the history: only one chunk and the small per-segment
+    daily totals are held at a time. Returns the refreshed daily aggregates.
+    """
+    # The header alone goes through clean, so the output has the columns a
+    # full read would produce even when some segments lack a few of them.
+    header = pd.DataFrame({col: pd.Series(dtype=object) for col in master_store.columns()})
+    columns = list(clean(header).columns)
+    empty_daily = aggregate_daily(pd.DataFrame(columns=columns))
+
+    writer = SalesReportWriter(output_path, columns)
+    segment_daily = [empty_daily] * len(master_store.segment_paths())
+    for index, chunk in master_store.iter_chunks(chunk_rows, **read_kwargs):
+        cleaned = clean(chunk)
+        writer.write(cleaned)
+        segment_daily[index] = merge_daily(segment_daily[index], aggregate_daily(cleaned))
+    writer.close()
+    logger.info(f"Cleaned {writer.rows} master rows in chunks of {chunk_rows}.")
+
+    return daily_store.update_from_segments(segment_daily, master_store)
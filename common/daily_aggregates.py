@@ -0,0 +1,155 @@
+import os
+import json
+import logging
+import pandas as pd
+from common.report_storage import WEEKDAYS, read_estimation_frame
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE_COLUMNS = ['date', 'weekday', 'sales', 'units']
+
+# Kept out of ReportFiles, which is uploaded to S3 as a whole.
+DAILY_AGGREGATES_DIR = r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\DailyAggregates"
+
+
+def aggregate_daily(df):
+    """Collapse cleaned transactions into one row per day."""
+    grouped = df.groupby('date')
+    daily = pd.DataFrame({
+        'sales': grouped['product_sales'].sum(),
+        'units': grouped['quantity'].sum() if 'quantity' in df.columns else 0.0,
+    })
+    daily.index = pd.to_datetime(daily.index)
+    daily.index.name = 'date'
+    return finalize(daily.reset_index())
+
+
+def finalize(daily):
+    """Sort by date and attach a categorical weekday."""
+    daily = daily.sort_values('date').reset_index(drop=True)
+    weekday_codes = daily['date'].dt.dayofweek.astype('int8')
+    daily['weekday'] = pd.Categorical.from_codes(weekday_codes, categories=WEEKDAYS)
+    return daily[AGGREGATE_COLUMNS]
+
+
+def merge_daily(*tables):
+    """Add up daily tables covering different rows, e.g. the existing table and newly ingested rows."""
+    combined = pd.concat(tables, ignore_index=True)
+    merged = combined.groupby('date', as_index=False)[['sales', 'units']].sum()
+    return finalize(merged)
+
+
+class DailyAggregateStore:
+    """Per-market table of daily sales and units.
+
+    The table is named after the cleaned sales report, kept in
+    DAILY_AGGREGATES_DIR, and records the content hashes of the master segments it was built from. When the master has only
+    gained new segments since the last build, just the new rows are
+    aggregated. Any other change to the master invalidates the table.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.meta_path = os.path.splitext(path)[0] + ".meta.json"
+
+    @classmethod
+    def for_report(cls, output_path, folder=DAILY_AGGREGATES_DIR):
+        report_name = os.path.splitext(os.path.basename(output_path))[0]
+        return cls(os.path.join(folder, report_name + "_daily.csv"))
+
+    def load_meta(self):
+        if os.path.exists(self.meta_path) and os.path.getsize(self.meta_path) > 0:
+            with open(self.meta_path, 'r') as f:
+                return json.load(f)
+        return {"segments": []}
+
+    def read_table(self):
+        daily = pd.read_csv(
+            self.path,
+            usecols=['date', 'sales', 'units'],
+            dtype={'sales': 'float64', 'units': 'float64'},
+        )
+        daily['date'] = pd.to_datetime(daily['date'], format='%Y-%m-%d')
+        return finalize(daily)
+
+    def write_table(self, daily, segments):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        daily.to_csv(tmp_path, index=False, date_format='%Y-%m-%d')
+        os.replace(tmp_path, self.path)
+
+        tmp_meta = self.meta_path + ".tmp"
+        with open(tmp_meta, 'w') as f:
+            json.dump({"segments": segments}, f, indent=2)
+        os.replace(tmp_meta, self.meta_path)
+
+    def update(self, cleaned_df, master_store):
+        """Bring the table in line with the master after a cleaning run.
+
+        cleaned_df must keep the row order of master_store.read(), so the rows
+        of newly appended segments are the tail of the frame.
+        """
+        hashes = master_store.content_hashes()
+        segments = [[h["segment"], h["sha1"]] for h in hashes]
+        known = self.load_meta()["segments"]
+
+        if known and known == segments[:len(known)] and os.path.exists(self.path):
+            if len(known) == len(segments):
+                logger.info("Daily aggregates already up to date.")
+                return self.read_table()
+            new_rows = sum(h["rows"] for h in hashes[len(known):])
+            daily = merge_daily(self.read_table(), aggregate_daily(cleaned_df.iloc[len(cleaned_df) - new_rows:]))
+            logger.info(f"Added {new_rows} new transactions to daily aggregates.")
+        else:
+            daily = aggregate_daily(cleaned_df)
+            logger.info(f"Rebuilt daily aggregates from {len(cleaned_df)} transactions.")
+
+        self.write_table(daily, segments)
+        return daily
+
+    def update_from_segments(self, segment_daily, master_store):
+        """Like update(), for a master that was cleaned chunk by chunk.
+
+        segment_daily holds one daily table per master segment, in the order
+        of master_store.content_hashes(), so only the tables of newly appended
+        segments are merged into an up-to-date table.
+        """
+        hashes = master_store.content_hashes()
+        segments = [[h["segment"], h["sha1"]] for h in hashes]
+        known = self.load_meta()["segments"]
+
+        if known and known == segments[:len(known)] and os.path.exists(self.path):
+            if len(known) == len(segments):
+                logger.info("Daily aggregates already up to date.")
+                return self.read_table()
+            daily = merge_daily(self.read_table(), *segment_daily[len(known):])
+            logger.info(f"Added {len(segments) - len(known)} new segment(s) to daily aggregates.")
+        else:
+            daily = merge_daily(*segment_daily)
+            logger.info(f"Rebuilt daily aggregates from {len(segments)} segment(s).")
+
+        self.write_table(daily, segments)
+        return daily
+
+    def load(self, master_store):
+        """Return the table if it matches the current master, otherwise None."""
+        if not os.path.exists(self.path):
+            return None
+        segments = [[h["segment"], h["sha1"]] for h in master_store.content_hashes()]
+        if self.load_meta()["segments"] != segments:
+            return None
+        return self.read_table()
+
+
+def load_daily_sales(output_path, master_store, skiprows=None):
+    """Daily totals for a market, from the aggregate table when it is current.
+
+    Falls back to aggregating the cleaned sales report when the table is
+    missing or was built from an older master.
+    """
+    daily = DailyAggregateStore.for_report(output_path).load(master_store)
+    if daily is not None:
+        return daily
+
+    logger.warning(f"Daily aggregates for {os.path.basename(output_path)} are stale. Aggregating the cleaned report.")
+    return aggregate_daily(read_estimation_frame(output_path, skiprows=skiprows))
@@ -0,0 +1,81 @@
+import os
+import re
+import time
+import logging
+from urllib.parse import urlparse, unquote
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+# Looks for a real URL behind a report table's download button: on the button
+# itself, on an enclosing link, or on a download link elsewhere in its row.
+REPORT_URL_JS = """
+const button = arguments[0];
+const link = button.closest('a[href]');
+const row = button.closest('kat-table-row');
+const rowLink = row && Array.from(row.querySelectorAll('a[href]')).find(a => /download|report/i.test(a.href));
+return button.getAttribute('href') || button.getAttribute('data-url')
+    || (link && link.href) || (rowLink && rowLink.href) || null;
+"""
+
+
+class IncompleteDownloadError(IOError):
+    """Raised when fewer bytes arrive than the server announced."""
+
+
+def report_url(driver, download_button):
+    """URL the download button points at, or None when the page only offers a script-driven click."""
+    url = driver.execute_script(REPORT_URL_JS, download_button)
+    return url if url and url.startswith("http") else None
+
+
+def seed_http_session(http, driver):
+    """Copy the browser's cookies and user agent into a requests session."""
+    http.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+    for cookie in driver.get_cookies():
+        http.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    return http
+
+
+def response_file_name(response, url):
+    disposition = response.headers.get("Content-Disposition", "")
+    match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', disposition)
+    if match:
+        return os.path.basename(unquote(match.group(1)))
+    return os.path.basename(unquote(urlparse(url).path))
+
+
+def download_report(http, url, download_dir, timeout=120):
+    """Stream url into download_dir under the server's file name. Returns (file_name, seconds).
+
+    The body is written to a .part file, checked against Content-Length when
+    the server sends one, and only then renamed into place, so a file with
+    the final name is always complete.
+    """
+    start = time.monotonic()
+    with http.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        file_name = response_file_name(response, url)
+        target = os.path.join(download_dir, file_name)
+        partial = target + ".part"
+        expected = response.headers.get("Content-Length")
+        written = 0
+        try:
+            with open(partial, "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                    written += len(chunk)
+            # Content-Length counts bytes on the wire, which differs from the
+            # decoded size when the server compresses the response.
+            received = response.raw.tell()
+            if expected is not None and received != int(expected):
+                raise IncompleteDownloadError(f"Received {received} of {expected} bytes for {file_name}.")
+            os.replace(partial, target)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    elapsed = time.monotonic() - start
+    logger.info(f"Downloaded {file_name} ({written} bytes) over HTTP in {elapsed:.1f}s")
+    return file_name, elapsed
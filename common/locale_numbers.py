@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+
+def parse_localized_numbers(values, decimal=",", thousands="."):
+    """Parse amounts written with a locale's separators, e.g. '1.234,56' with decimal=',' and thousands='.'.
+
+    Gives the same result as stripping `thousands`, swapping `decimal` for '.'
+    and calling pd.to_numeric(errors='coerce'), but the string work runs once
+    per distinct value instead of once per row. Transaction amounts repeat
+    heavily (prices, fees), so a multi-year master has far fewer distinct
+    values than rows. Missing values stay NaN and unparseable text becomes NaN.
+    """
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques, dtype=object).astype(str)
+    if thousands:
+        text = text.str.replace(thousands, '', regex=False)
+    if decimal != '.':
+        text = text.str.replace(decimal, '.', regex=False)
+    parsed = pd.to_numeric(text, errors='coerce').to_numpy()
+
+    if (codes < 0).any():
+        # Code -1 marks a missing value; it picks the NaN appended at the end.
+        parsed = np.append(parsed.astype('float64'), np.nan)
+    return pd.Series(parsed[codes], index=values.index, name=values.name)
@@ -0,0 +1,202 @@
+"""Declarative settings for each Seller Central marketplace the EU scraper engine handles.
+
+Adding a market means adding an entry here; the engine in
+scraper/eu-marketplace-scraper.py reads everything market-specific from it.
+
+Keys:
+    locale             language/region of the report headers, dates and numbers
+    folder             download/report folder name under europe-sales-reports
+    account_button     XPath of the marketplace button in the account switcher
+    pause_before_click jittered pause (seconds) before clicking that button, if the site needs one
+    header_lowercase   lower-case report headers before applying column_map
+    header_drop_chars  characters removed from report headers before applying column_map
+    column_map         localized report header -> our column name
+    month_names        localized month abbreviation -> English, for the date column
+    date_format        strptime format of the timestamps once month names are in English and the zone suffix is dropped
+    dayfirst           read ambiguous dates day first when a timestamp doesn't match date_format
+    decimal            decimal separator of the amount columns
+    thousands          thousands separator of the amount columns
+"""
+
+MARKETPLACES = {
+    "Germany": {
+        "locale": "de_DE",
+        "folder": "germany",
+        "account_button": "//button[.//span[text()='Germany']]",
+        "pause_before_click": None,
+        "header_lowercase": False,
+        "header_drop_chars": "",
+        "column_map": {
+            'Datum_Uhrzeit': 'date_time',
+            'Abrechnungsnummer': 'settlement_id',
+            'Typ': 'type',
+            'Bestellnummer': 'order_id',
+            'SKU': 'sku',
+            'Beschreibung': 'description',
+            'Menge': 'quantity',
+            'Marketplace': 'marketplace',
+            'Versand': 'fulfillment',
+            'Ort_der_Bestellung': 'order_city',
+            'Bundesland': 'order_state',
+            'Postleitzahl': 'order_postal',
+            'Steuererhebungsmodell': 'tax_collection_model',
+            'Umsätze': 'product_sales',
+            'Produktumsatzsteuer': 'product_sales_tax',
+            'Gutschrift_für_Versandkosten': 'shipping_credits',
+            'Steuer_auf_Versandgutschrift': 'shipping_credits_tax',
+            'Gutschrift_für_Geschenkverpackung': 'gift_wrap_credits',
+            'Steuer_auf_Geschenkverpackungsgutschriften': 'giftwrap_credits_tax',
+            'Rabatte_aus_Werbeaktionen': 'promotional_rebates',
+            'Steuer_auf_Aktionsrabatte': 'promotional_rebates_tax',
+            'Einbehaltene_Steuer_auf_Marketplace': 'marketplace_withheld_tax',
+            'Verkaufsgebühren': 'selling_fees',
+            'Gebühren_zu_Versand_durch_Amazon': 'fba_fees',
+            'Andere_Transaktionsgebühren': 'other_transaction_fees',
+            'Andere': 'other',
+            'Gesamt': 'total',
+        },
+        "month_names": None,
+        "date_format": "%d.%m.%Y %H:%M:%S",
+        "dayfirst": True,
+        "decimal": ",",
+        "thousands": ".",
+    },
+    "France": {
+        "locale": "fr_FR",
+        "folder": "france",
+        "account_button": "//button[.//span[text()='France']]",
+        "pause_before_click": None,
+        "header_lowercase": False,
+        "header_drop_chars": "",
+        "column_map": {
+            "date_heure": "date_time",
+            "numéro_de_versement": "settlement_id",
+            "type": "type",
+            "numéro_de_la_commande": "order_id",
+            "sku": "sku",
+            "description": "description",
+            "quantité": "quantity",
+            "Marketplace": "marketplace",
+            "traitement": "fulfillment",
+            "ville_d'où_provient_la_commande": "order_city",
+            "Région_d'où_provient_la_commande": "order_state",
+            "code_postal_de_la_commande": "order_postal",
+            "Modèle_de_perception_des_taxes": "tax_collection_model",
+            "ventes_de_produits": "product_sales",
+            "Taxes_sur_la_vente_des_produits": "product_sales_tax",
+            "crédits_d'expédition": "shipping_credits",
+            "taxe_sur_les_crédits_d’expédition": "shipping_credits_tax",
+            "crédits_sur_l'emballage_cadeau": "gift_wrap_credits",
+            "Taxes_sur_les_crédits_cadeaux": "giftwrap_credits_tax",
+            "Rabais_promotionnels": "promotional_rebates",
+            "Taxes_sur_les_remises_promotionnelles": "promotional_rebates_tax",
+            "Taxes_retenues_sur_le_site_de_vente": "marketplace_withheld_tax",
+            "frais_de_vente": "selling_fees",
+            "Frais_Expédié_par_Amazon": "fba_fees",
+            "autres_frais_de_transaction": "other_transaction_fees",
+            "autre": "other",
+            "total": "total",
+        },
+        "month_names": {
+            'janv.': 'Jan', 'févr.': 'Feb', 'mars': 'Mar', 'avr.': 'Apr',
+            'mai': 'May', 'juin': 'Jun', 'juil.': 'Jul', 'août': 'Aug',
+            'sept.': 'Sep', 'oct.': 'Oct', 'nov.': 'Nov', 'déc.': 'Dec',
+        },
+        "date_format": "%d %b %Y %H:%M:%S",
+        "dayfirst": True,
+        "decimal": ",",
+        "thousands": ".",
+    },
+    "Italy": {
+        "locale": "it_IT",
+        "folder": "italy",
+        "account_button": "//button[.//span[contains(text(), 'Italy')]]",
+        "pause_before_click": None,
+        "header_lowercase": True,
+        "header_drop_chars": ":",
+        "column_map": {
+            "data_ora": "date_time",
+            "numero_pagamento": "settlement_id",
+            "tipo": "type",
+            "numero_ordine": "order_id",
+            "sku": "sku",
+            "descrizione": "description",
+            "quantità": "quantity",
+            "marketplace": "marketplace",
+            "gestione": "fulfillment",
+            "città_di_provenienza_dell'ordine": "order_city",
+            "provincia_di_provenienza_dell'ordine": "order_state",
+            "cap_dell'ordine": "order_postal",
+            "modello_di_riscossione_delle_imposte": "tax_collection_model",
+            "vendite": "product_sales",
+            "imposta_sulle_vendite_dei_prodotti": "product_sales_tax",
+            "accrediti_per_le_spedizioni": "shipping_credits",
+            "imposta_accrediti_per_le_spedizioni": "shipping_credits_tax",
+            "accrediti_per_confezioni_regalo": "gift_wrap_credits",
+            "imposta_sui_crediti_confezione_regalo": "giftwrap_credits_tax",
+            "sconti_promozionali": "promotional_rebates",
+            "imposta_sugli_sconti_promozionali": "promotional_rebates_tax",
+            "trattenuta_iva_del_marketplace": "marketplace_withheld_tax",
+            "commissioni_di_vendita": "selling_fees",
+            "costi_del_servizio_logistica_di_amazon": "fba_fees",
+            "altri_costi_relativi_alle_transazioni": "other_transaction_fees",
+            "altro": "other",
+            "totale": "total",
+        },
+        "month_names": {
+            'gen': 'Jan', 'feb': 'Feb', 'mar': 'Mar', 'apr': 'Apr',
+            'mag': 'May', 'giu': 'Jun', 'lug': 'Jul', 'ago': 'Aug',
+            'set': 'Sep', 'ott': 'Oct', 'nov': 'Nov', 'dic': 'Dec',
+        },
+        "date_format": "%d %b %Y %H:%M:%S",
+        "dayfirst": True,
+        "decimal": ",",
+        "thousands": ".",
+    },
+    "Spain": {
+        "locale": "es_ES",
+        "folder": "spain",
+        "account_button": "//button[.//span[text()='Spain']]",
+        "pause_before_click": (1, 2),
+        "header_lowercase": True,
+        "header_drop_chars": "",
+        "column_map": {
+            "fecha_y_hora": "date_time",
+            "identificador_de_pago": "settlement_id",
+            "tipo": "type",
+            "número_de_pedido": "order_id",
+            "sku": "sku",
+            "descripción": "description",
+            "cantidad": "quantity",
+            "web_de_amazon": "marketplace",
+            "gestión_logística": "fulfillment",
+            "ciudad_de_procedencia_del_pedido": "order_city",
+            "comunidad_autónoma_de_procedencia_del_pedido": "order_state",
+            "código_postal_de_procedencia_del_pedido": "order_postal",
+            "formulario_de_recaudación_de_impuestos": "tax_collection_model",
+            "ventas_de_productos": "product_sales",
+            "impuesto_de_ventas_de_productos": "product_sales_tax",
+            "abonos_de_envío": "shipping_credits",
+            "impuestos_por_abonos_de_envío": "shipping_credits_tax",
+            "abonos_de_envoltorio_para_regalo": "gift_wrap_credits",
+            "impuestos_por_abonos_de_envoltorio_para_regalo": "giftwrap_credits_tax",
+            "devoluciones_promocionales": "promotional_rebates",
+            "impuestos_de_descuentos_por_promociones": "promotional_rebates_tax",
+            "impuesto_retenido_en_el_sitio_web": "marketplace_withheld_tax",
+            "tarifas_de_venta": "selling_fees",
+            "tarifas_de_logística_de_amazon": "fba_fees",
+            "tarifas_de_otras_transacciones": "other_transaction_fees",
+            "otro": "other",
+            "total": "total",
+        },
+        "month_names": {
+            'ene': 'Jan', 'feb': 'Feb', 'mar': 'Mar', 'abr': 'Apr',
+            'may': 'May', 'jun': 'Jun', 'jul': 'Jul', 'ago': 'Aug',
+            'sep': 'Sep', 'oct': 'Oct', 'nov': 'Nov', 'dic': 'Dec',
+        },
+        "date_format": "%d %b %Y %H:%M:%S",
+        "dayfirst": True,
+        "decimal": ",",
+        "thousands": ".",
+    },
+}
@@ -0,0 +1,192 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import pandas as pd
+from datetime import datetime
+from pandas.errors import ParserError
+from common.report_storage import resolve_format
+
+logger = logging.getLogger(__name__)
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """SHA-1 of a file's content, read in chunks."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_report_body(report_file, segment_path, skiprows):
+    """Copy a report to segment_path without its first skiprows preamble lines, byte for byte."""
+    with open(report_file, 'rb') as src, open(segment_path, 'wb') as dst:
+        for _ in range(skiprows):
+            src.readline()
+        shutil.copyfileobj(src, dst)
+
+
+class MasterStore:
+    """Append-only master transaction store.
+
+    The legacy master CSV is kept as the base segment and is never rewritten.
+    Every ingested report is written once as its own segment next to it, and a
+    manifest records which report files have already been ingested, so the
+    nightly append costs one day of rows instead of the full history.
+
+    With the "parquet" storage format new segments are written as Parquet
+    files holding the raw report text, so later reads skip CSV tokenizing.
+    """
+
+    def __init__(self, master_file, segments_dir=None, storage_format=None):
+        self.master_file = master_file
+        self.storage_format = resolve_format(storage_format)
+        self.segments_dir = segments_dir or os.path.splitext(master_file)[0] + "_segments"
+        self.manifest_path = os.path.join(self.segments_dir, "manifest.json")
+
+    def load_manifest(self):
+        """Load the manifest of ingested report files."""
+        if os.path.exists(self.manifest_path) and os.path.getsize(self.manifest_path) > 0:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        return {"segments": []}
+
+    def save_manifest(self, manifest):
+        """Write the manifest atomically so a crash never leaves it half written."""
+        os.makedirs(self.segments_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def append_report(self, report_file, skiprows=7):
+        """Write a downloaded report as a new segment unless it was already ingested."""
+        report_name = os.path.basename(report_file)
+        stat = os.stat(report_file)
+        manifest = self.load_manifest()
+
+        existing = next((s for s in manifest["segments"] if s["report_file"] == report_name), None)
+        if existing and existing["size"] == stat.st_size and existing["mtime"] == stat.st_mtime:
+            logger.info(f"{report_name} already ingested into master. Skipping.")
+            return False
+
+        os.makedirs(self.segments_dir, exist_ok=True)
+        # Read as text so nothing is re-typed on the way in: inference would turn
+        # a blank-containing integer column into '1.0', which locale parsing
+        # later reads as 10.
+        new_df = pd.read_csv(report_file, skiprows=skiprows, dtype=str)
+        if self.storage_format == "parquet":
+            segment_name = os.path.splitext(report_name)[0] + ".parquet"
+            new_df.to_parquet(os.path.join(self.segments_dir, segment_name), index=False)
+        else:
+            segment_name = os.path.splitext(report_name)[0] + ".csv"
+            copy_report_body(report_file, os.path.join(self.segments_dir, segment_name), skiprows)
+
+        if existing:
+            manifest["segments"].remove(existing)
+            if existing["segment"] != segment_name:
+                os.remove(os.path.join(self.segments_dir, existing["segment"]))
+            logger.info(f"{report_name} changed since last ingest. Replacing its segment.")
+
+        manifest["segments"].append({
+            "report_file": report_name,
+            "segment": segment_name,
+            "sha1": file_hash(os.path.join(self.segments_dir, segment_name)),
+            "rows": len(new_df),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "ingested_at": datetime.now().isoformat(timespec='seconds'),
+        })
+        self.save_manifest(manifest)
+        logger.info(f"Appended {len(new_df)} rows from {report_name} as a new master segment.")
+        return True
+
+    def segment_paths(self):
+        """Paths of every segment in ingestion order, legacy master first."""
+        paths = [self.master_file] if os.path.exists(self.master_file) else []
+        manifest = self.load_manifest()
+        paths.extend(os.path.join(self.segments_dir, s["segment"]) for s in manifest["segments"])
+        return paths
+
+    def content_hashes(self):
+        """Content hash and row count of every segment, legacy master first.
+
+        The legacy master is only re-hashed when its size or mtime changes.
+        """
+        manifest = self.load_manifest()
+        hashes = []
+        if os.path.exists(self.master_file):
+            stat = os.stat(self.master_file)
+            base = manifest.get("base")
+            if not base or base["size"] != stat.st_size or base["mtime"] != stat.st_mtime:
+                base = {"size": stat.st_size, "mtime": stat.st_mtime, "sha1": file_hash(self.master_file)}
+                manifest["base"] = base
+                self.save_manifest(manifest)
+            hashes.append({"segment": os.path.basename(self.master_file), "sha1": base["sha1"], "rows": None})
+
+        for s in manifest["segments"]:
+            sha1 = s.get("sha1") or file_hash(os.path.join(self.segments_dir, s["segment"]))
+            hashes.append({"segment": s["segment"], "sha1": sha1, "rows": s["rows"]})
+        return hashes
+
+    def read_segment(self, path, **kwargs):
+        if path.endswith(".parquet"):
+            return pd.read_parquet(path, columns=kwargs.get("usecols"))
+        try:
+            return pd.read_csv(path, low_memory=False, **kwargs)
+        except ParserError as e:
+            if "Expected 1 fields in line 8" in str(e):
+                logger.warning("ParserError encountered. Retried reading file with skiprows=7.")
+                return pd.read_csv(path, skiprows=7, low_memory=False, **kwargs)
+            raise e
+
+    def read(self, **kwargs):
+        """Read the full master history as a single DataFrame."""
+        frames = [self.read_segment(path, **kwargs) for path in self.segment_paths()]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def preamble_rows(self, path):
+        """7 for a CSV segment that still carries the report's preamble lines, otherwise 0."""
+        try:
+            pd.read_csv(path, nrows=20)
+        except ParserError as e:
+            if "Expected 1 fields in line 8" in str(e):
+                return 7
+            raise e
+        return 0
+
+    def segment_columns(self, path):
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            return list(pq.ParquetFile(path).schema_arrow.names)
+        return list(pd.read_csv(path, nrows=0, skiprows=self.preamble_rows(path)).columns)
+
+    def columns(self):
+        """Union of the segment headers in first-seen order, i.e. the columns read() would return."""
+        columns = []
+        for path in self.segment_paths():
+            columns.extend(c for c in self.segment_columns(path) if c not in columns)
+        return columns
+
+    def read_segment_chunks(self, path, chunk_rows, **kwargs):
+        """Yield a segment as DataFrames of at most chunk_rows rows."""
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=kwargs.get("usecols")):
+                yield batch.to_pandas()
+            return
+        kwargs.setdefault("skiprows", self.preamble_rows(path))
+        yield from pd.read_csv(path, chunksize=chunk_rows, low_memory=False, **kwargs)
+
+    def iter_chunks(self, chunk_rows, **kwargs):
+        """Yield (segment_index, chunk) over the master history without holding more than one chunk.
+
+        Segments come in the order of segment_paths() and content_hashes().
+        """
+        for index, path in enumerate(self.segment_paths()):
+            for chunk in self.read_segment_chunks(path, chunk_rows, **kwargs):
+                yield index, chunk
@@ -0,0 +1,124 @@
+import os
+import json
+import pickle
+import logging
+import numpy as np
+import pandas as pd
+from common.master_store import file_hash
+
+logger = logging.getLogger(__name__)
+
+MATERIAL_MASTER_SHEET = 'All ASINs with Priority'
+
+
+class MaterialMaster:
+    """SKU -> ASIN (and priority) lookup from the material master workbook.
+
+    Opening the workbook with openpyxl is slow, so the parsed table is pickled
+    next to it together with the workbook's size, mtime and SHA-1. Later runs
+    load the pickle while size and mtime are unchanged, re-hash when they
+    change, and only re-parse the workbook when its content really changed.
+    """
+
+    def __init__(self, workbook_path, cache_path=None, sheet_name=MATERIAL_MASTER_SHEET):
+        self.workbook_path = workbook_path
+        self.sheet_name = sheet_name
+        self.cache_path = cache_path or os.path.splitext(workbook_path)[0] + ".cache.pkl"
+        self.mapping = None
+        self.asins = None
+
+    def load_cache(self):
+        if os.path.exists(self.cache_path) and os.path.getsize(self.cache_path) > 0:
+            try:
+                with open(self.cache_path, 'rb') as f:
+                    return pickle.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable material master cache. {e}")
+        return None
+
+    def save_cache(self, cache):
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_path)
+
+    def read_workbook(self):
+        """Parse the sku, ASIN and priority columns of the workbook."""
+        dff = pd.read_excel(
+            self.workbook_path, sheet_name=self.sheet_name,
+            usecols=lambda col: col in ('seller-sku', 'ASIN') or 'priority' in str(col).lower(),
+        )
+        dff = dff.rename(columns={'seller-sku': 'sku'})
+        priority = next((col for col in dff.columns if 'priority' in str(col).lower()), None)
+        if priority:
+            dff = dff.rename(columns={priority: 'priority'})
+        return dff.drop_duplicates(subset='sku').reset_index(drop=True)
+
+    def table(self):
+        """The parsed lookup table, from the cache when the workbook is unchanged."""
+        cache = self.load_cache()
+        try:
+            stat = os.stat(self.workbook_path)
+            if cache and cache["size"] == stat.st_size and cache["mtime"] == stat.st_mtime:
+                return cache["table"]
+
+            sha1 = file_hash(self.workbook_path)
+            if cache and cache["sha1"] == sha1:
+                logger.info("Material Master touched but unchanged. Using cached lookup.")
+                table = cache["table"]
+            else:
+                logger.info("Reading Material Master file.")
+                table = self.read_workbook()
+                logger.info(f"Cached {len(table)} SKUs from the Material Master.")
+            self.save_cache({"size": stat.st_size, "mtime": stat.st_mtime, "sha1": sha1, "table": table})
+            return table
+        except Exception as e:
+            if cache:
+                logger.warning(f"Couldn't read Material Master file, using the cached lookup. {e}")
+                return cache["table"]
+            logger.error(f"Failed to read material master: {e}")
+            return pd.DataFrame(columns=['sku', 'ASIN'])
+
+    def sku_asin_map(self):
+        if self.mapping is None:
+            self.mapping = self.table().set_index('sku')['ASIN'].to_dict()
+        return self.mapping
+
+    def asin_categories(self):
+        """Every ASIN in the material master: the shared dictionary for the ASIN column."""
+        if self.asins is None:
+            self.asins = pd.Index(self.table()['ASIN'].dropna().unique())
+        return self.asins
+
+    def map_asins(self, skus):
+        """ASIN of every SKU as a categorical over asin_categories().
+
+        The SKUs are encoded as a categorical and only their distinct values
+        are looked up, then the result is spread back through the codes.
+        """
+        skus = skus.astype('category')
+        categories = self.asin_categories()
+        asins = skus.cat.categories.map(self.sku_asin_map())
+        # Code -1 marks a missing SKU; it picks the -1 appended at the end.
+        asin_codes = np.append(categories.get_indexer(asins), -1)
+        codes = asin_codes[skus.cat.codes.to_numpy()]
+        return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=skus.index, name='ASIN')
+
+    def write_json(self, json_path):
+        """Write the SKU -> ASIN map to json_path unless the file already holds it. Returns True when written."""
+        sku_asin_map = self.sku_asin_map()
+        if not sku_asin_map:
+            logger.warning(f"Material Master lookup is empty. Leaving {os.path.basename(json_path)} as it is.")
+            return False
+        content = json.dumps(sku_asin_map, indent=1)
+        if os.path.exists(json_path):
+            with open(json_path, 'r') as f:
+                if f.read() == content:
+                    return False
+
+        tmp_path = json_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, json_path)
+        logger.info(f"Updated {os.path.basename(json_path)} with {len(sku_asin_map)} SKUs.")
+        return True
@@ -0,0 +1,100 @@
+import os
+import time
+import random
+import logging
+import threading
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+logger = logging.getLogger(__name__)
+
+# human: jittered pauses around login and clicks, as Seller Central sees them.
+# fast: no deliberate pauses, for local test stand-ins of the site.
+PROFILES = {
+    "human": {"pause_scale": 1.0, "quiet_period": 0.5, "poll_frequency": 0.25},
+    "fast": {"pause_scale": 0.0, "quiet_period": 0.1, "poll_frequency": 0.05},
+}
+
+# Resolves once nothing has been fetched for a moment, i.e. the network is idle.
+RESOURCE_COUNT_JS = "return window.performance.getEntriesByType('resource').length;"
+
+
+class PacingPolicy:
+    """Decides how long scrapers wait between browser actions and tallies the time spent.
+
+    Readiness waits (page loaded, network idle, element present) return as
+    soon as the condition holds. Deliberate jittered pauses are kept only
+    where a human-looking rhythm matters, and are skipped entirely by the
+    "fast" profile. Totals are kept per run so the nightly log shows how much
+    wall-clock went to idling.
+    """
+
+    def __init__(self, profile="human"):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown pacing profile '{profile}', expected one of {', '.join(PROFILES)}")
+        self.profile = profile
+        self.settings = PROFILES[profile]
+        self.slept_seconds = 0.0
+        self.waited_seconds = 0.0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("SCRAPER_PACING", "human"))
+
+    def pause(self, min_seconds, max_seconds):
+        """Jittered pause before an action a person would not do instantly."""
+        delay = random.uniform(min_seconds, max_seconds) * self.settings["pause_scale"]
+        if delay <= 0:
+            return
+        logger.info(f"Delaying for {delay:.2f} seconds...")
+        time.sleep(delay)
+        with self.lock:
+            self.slept_seconds += delay
+
+    def wait_until(self, driver, condition, timeout=10):
+        """Wait for condition(driver) to hold and return its value."""
+        start = time.monotonic()
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=self.settings["poll_frequency"]).until(condition)
+        finally:
+            with self.lock:
+                self.waited_seconds += time.monotonic() - start
+
+    def page_ready(self, driver, timeout=15):
+        """Wait until the document has loaded and no new resources arrive for the quiet period.
+
+        A page that never settles is logged and not treated as an error, since
+        the element waits that follow will catch a page that really is broken.
+        """
+        try:
+            self.wait_until(driver, lambda d: d.execute_script("return document.readyState") == "complete", timeout)
+            last = {"count": -1, "since": time.monotonic()}
+
+            def network_idle(d):
+                count = d.execute_script(RESOURCE_COUNT_JS)
+                now = time.monotonic()
+                if count != last["count"]:
+                    last["count"], last["since"] = count, now
+                    return False
+                return now - last["since"] >= self.settings["quiet_period"]
+
+            self.wait_until(driver, network_idle, timeout)
+        except TimeoutException:
+            logger.warning(f"Page did not settle within {timeout}s, continuing.")
+
+    def summary(self):
+        return {
+            "profile": self.profile,
+            "slept_seconds": round(self.slept_seconds, 2),
+            "waited_seconds": round(self.waited_seconds, 2),
+        }
+
+    def log_summary(self):
+        logger.info(
+            f"Pacing ({self.profile}): {self.slept_seconds:.1f}s in deliberate pauses, "
+            f"{self.waited_seconds:.1f}s waiting on page readiness."
+        )
+
+
+pacing = PacingPolicy.from_env()
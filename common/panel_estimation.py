@@ -0,0 +1,81 @@
+import logging
+import numpy as np
+import pandas as pd
+from common.weekday_averages import panel_cascading_weekday_averages
+
+logger = logging.getLogger(__name__)
+
+# The month-end rules every estimate follows, whether for one market, a panel
+# of markets, a range of backfilled report dates or per-SKU groups: actuals are
+# month-to-date sales up to the report date, the day before the cutoff, and
+# each remaining day of the month adds its weekday's cascading average.
+
+
+def report_month(cutoff_date):
+    """(report_date, month_start, month_end) of the estimate made on cutoff_date."""
+    report_date = pd.Timestamp(cutoff_date).normalize() - pd.Timedelta(days=1)
+    month_start = report_date.replace(day=1)
+    return report_date, month_start, month_start + pd.offsets.MonthEnd(0)
+
+
+def remaining_weekday_counts(cutoff_dates):
+    """(cutoff x weekday) count of each weekday, Monday first, from each cutoff date to the end of its report month.
+
+    All zero when the report date is the last day of its month.
+    """
+    cutoffs = pd.DatetimeIndex(cutoff_dates).normalize()
+    month_ends = (cutoffs - pd.Timedelta(days=1)) + pd.offsets.MonthEnd(0)
+    n_days = np.asarray((month_ends - cutoffs).days + 1).clip(min=0)
+    offsets = (np.arange(7) - cutoffs.dayofweek.to_numpy()[:, None]) % 7
+    return n_days[:, None] // 7 + (offsets < (n_days % 7)[:, None])
+
+
+def month_end_estimates(actual, weekday_avgs, cutoff_dates, index=None):
+    """Rounded actual, estimated and total sales from month-to-date actuals and (row x weekday) averages.
+
+    Row i is projected from cutoff_dates[i], or from cutoff_dates itself when
+    it is a single date shared by every row.
+    """
+    actual = np.asarray(actual, dtype='float64')
+    if np.ndim(cutoff_dates) == 0:
+        cutoff_dates = [cutoff_dates] * len(actual)
+    estimated = (remaining_weekday_counts(cutoff_dates) * np.asarray(weekday_avgs)).sum(axis=1)
+    return pd.DataFrame({
+        'actual_sales': np.round(actual, 2),
+        'estimated_sales': np.round(estimated, 2),
+        'total_estimation': np.round(actual + estimated, 2),
+    }, index=index)
+
+
+def stack_daily_panel(daily_by_market):
+    """Stack {market: daily sales Series indexed by date} into one Series indexed by (market, date)."""
+    return pd.concat(daily_by_market, names=['market', 'date'])
+
+
+def panel_month_end_estimates(daily_panel, cutoff_date):
+    """Month-end estimate for every market of a (market, date) panel, one row per market in the panel's order.
+
+    Actuals are summed and the cascading weekday averages of the days before
+    cutoff_date computed for all markets at once.
+    """
+    markets = pd.unique(daily_panel.index.get_level_values(0))
+    dates = pd.DatetimeIndex(daily_panel.index.get_level_values(1))
+    report_date, month_start, month_end = report_month(cutoff_date)
+
+    in_month = (dates >= month_start) & (dates <= report_date)
+    actual = daily_panel[in_month].groupby(level=0, sort=False).sum().reindex(markets, fill_value=0.0)
+
+    if report_date == month_end:
+        logger.info("Report is for the last day of the month. Using actuals only.")
+        weekday_avgs = np.zeros((len(markets), 7))
+    else:
+        weekday_avgs = panel_cascading_weekday_averages(daily_panel[dates <= report_date])
+        weekday_avgs = weekday_avgs.reindex(markets, fill_value=0.0).to_numpy()
+
+    return month_end_estimates(actual, weekday_avgs, cutoff_date, index=pd.Index(markets, name='market'))
+
+
+def month_end_estimate(daily_sales, cutoff_date, market):
+    """panel_month_end_estimates() for one market's daily sales Series, as a sales_results.json record."""
+    row = panel_month_end_estimates(stack_daily_panel({market: daily_sales}), cutoff_date).loc[market]
+    return {"market": market, **{key: float(value) for key, value in row.items()}}
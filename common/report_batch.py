@@ -0,0 +1,53 @@
+import os
+import time
+import logging
+
+from common.browser_pool import browser_pool
+from common.report_poller import poll_until, ReportWaitTimeout
+
+logger = logging.getLogger(__name__)
+
+
+def download_reports_concurrently(region, scrapers, start_date, end_date, timeout=900):
+    """Request every marketplace's report up front, then download each one as it becomes ready.
+
+    scrapers maps a market name to a scraper object from one Seller Central
+    region. Seller Central generates reports server-side, so all requests are
+    in flight together and the total wait is roughly the slowest report
+    rather than the sum. Each poll round switches to every pending
+    marketplace in turn. Returns {market: downloaded file name}; markets still
+    pending at the deadline are logged and left out.
+    """
+    first = next(iter(scrapers.values()))
+    downloaded = {}
+    with browser_pool.session(region, first.setup_driver) as session:
+        requested_at = {}
+        before_files = {}
+        for market, scraper in scrapers.items():
+            scraper.attach(session)
+            scraper.sign_in()
+            scraper.navigate_to_reports()
+            before_files[market] = set(os.listdir(scraper.download_dir))
+            scraper.set_date_range(start_date, end_date)
+            scraper.request_report()
+            requested_at[market] = time.monotonic()
+            logger.info(f"Requested {market} report.")
+
+        pending = list(scrapers)
+
+        def download_ready_reports():
+            for market in list(pending):
+                scraper = scrapers[market]
+                scraper.attach(session)
+                scraper.navigate_to_reports()
+                if scraper.click_download_if_ready():
+                    generation_seconds = time.monotonic() - requested_at[market]
+                    downloaded[market] = scraper.collect_download(before_files[market], generation_seconds)
+                    pending.remove(market)
+            return not pending
+
+        try:
+            poll_until(download_ready_reports, timeout=timeout, initial_delay=5, max_delay=60, description=f"{region} reports")
+        except ReportWaitTimeout:
+            logger.error(f"Reports not ready before the deadline: {', '.join(pending)}")
+    return downloaded
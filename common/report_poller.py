@@ -0,0 +1,77 @@
+import os
+import re
+import json
+import time
+import random
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+WAIT_METRICS_PATH = r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\report_wait_times.jsonl'
+
+# Chrome writes to these while a download is still in progress.
+PARTIAL_SUFFIXES = ('.crdownload', '.tmp', '.part')
+
+
+class ReportWaitTimeout(TimeoutError):
+    """Raised when a report is not ready before the poller's deadline."""
+
+
+def poll_until(check, timeout=600, initial_delay=2, max_delay=30, backoff=1.5, jitter=0.25, description="condition"):
+    """Call check() until it returns something truthy, backing off between calls.
+
+    Delays grow by `backoff` up to `max_delay`, each randomized by +/- `jitter`,
+    and never sleep past the overall `timeout`. Returns (result, waited_seconds)
+    and raises ReportWaitTimeout once the deadline passes.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = initial_delay
+    while True:
+        result = check()
+        if result:
+            return result, time.monotonic() - start
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ReportWaitTimeout(f"Timed out after {timeout}s waiting for {description}.")
+        sleep_for = min(delay * random.uniform(1 - jitter, 1 + jitter), remaining)
+        logger.info(f"Still waiting for {description}, checking again in {sleep_for:.1f}s...")
+        time.sleep(sleep_for)
+        delay = min(delay * backoff, max_delay)
+
+
+def completed_download(download_dir, before_files, pattern):
+    """Return the name of a finished download matching pattern that is not in before_files."""
+    pattern = re.compile(pattern)
+    for name in set(os.listdir(download_dir)) - set(before_files):
+        if name.endswith(PARTIAL_SUFFIXES) or not pattern.match(name):
+            continue
+        if os.path.getsize(os.path.join(download_dir, name)) > 0:
+            return name
+    return None
+
+
+def wait_for_download(download_dir, before_files, pattern, timeout=120, **kwargs):
+    """Watch download_dir until a completed file matching pattern appears. Returns (name, waited_seconds)."""
+    return poll_until(
+        lambda: completed_download(download_dir, before_files, pattern),
+        timeout=timeout, initial_delay=0.5, max_delay=5,
+        description=f"download in {download_dir}", **kwargs
+    )
+
+
+def record_wait_time(market, generation_seconds, download_seconds, path=WAIT_METRICS_PATH):
+    """Append how long report generation and download took as one JSON line."""
+    logger.info(f"{market} report ready after {generation_seconds:.1f}s, downloaded in {download_seconds:.1f}s")
+    entry = {
+        "recorded_at": datetime.now().isoformat(timespec='seconds'),
+        "market": market,
+        "generation_seconds": round(generation_seconds, 2),
+        "download_seconds": round(download_seconds, 2),
+    }
+    try:
+        with open(path, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        logger.warning(f"Could not record report wait time: {e}")
@@ -0,0 +1,162 @@
+import os
+import shutil
+import logging
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# "csv" keeps the existing single-file outputs, "parquet" switches to a
+# month-partitioned dataset directory next to the CSV path.
+STORAGE_FORMAT = os.getenv("SALES_REPORT_FORMAT", "csv").lower()
+
+DATE_COLUMNS = ['date']
+
+NUMERICAL_COLUMNS = [
+    'quantity', 'product_sales', 'product_sales_tax', 'shipping_credits',
+    'shipping_credits_tax', 'gift_wrap_credits', 'giftwrap_credits_tax', 'Regulatory_Fee',
+    'Tax_On_Regulatory_Fee', 'promotional_rebates', 'promotional_rebates_tax',
+    'marketplace_withheld_tax', 'selling_fees', 'fba_fees', 'other_transaction_fees',
+    'other', 'total']
+
+# Text columns with few distinct values, held as categoricals once cleaned.
+CATEGORICAL_COLUMNS = ['weekday', 'sku', 'ASIN', 'description', 'marketplace', 'fulfillment']
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# The estimators only ever use these two columns of a cleaned report.
+ESTIMATION_COLUMNS = ['date', 'product_sales']
+
+PARTITION_COLUMN = 'month'
+
+
+def resolve_format(storage_format=None):
+    """Return the storage format to use, falling back to CSV when pyarrow is missing."""
+    storage_format = (storage_format or STORAGE_FORMAT).lower()
+    if storage_format == "parquet" and pyarrow is None:
+        logger.warning("pyarrow is not installed. Falling back to CSV storage.")
+        return "csv"
+    return storage_format
+
+
+def dataset_path(output_path):
+    """Directory holding the Parquet dataset for a given CSV output path."""
+    return os.path.splitext(output_path)[0]
+
+
+def apply_schema(df):
+    """Cast a cleaned sales report to the declared column types."""
+    df = df.copy()
+    for col in df.columns:
+        if col in DATE_COLUMNS:
+            df[col] = pd.to_datetime(df[col])
+        elif col in NUMERICAL_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        elif col in CATEGORICAL_COLUMNS:
+            df[col] = df[col].astype('category')
+        else:
+            df[col] = df[col].astype('string')
+    return df
+
+
+def encode_categoricals(df):
+    """Convert the repetitive text columns of a cleaned report to categoricals, in place."""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def write_sales_report(df, output_path, storage_format=None):
+    """Write a cleaned sales report as CSV or as a month-partitioned Parquet dataset."""
+    if resolve_format(storage_format) != "parquet":
+        df.to_csv(output_path, index=False)
+        return output_path
+
+    target = dataset_path(output_path)
+    tmp_target = target + ".tmp"
+    shutil.rmtree(tmp_target, ignore_errors=True)
+
+    typed_df = apply_schema(df)
+    typed_df[PARTITION_COLUMN] = typed_df['date'].dt.strftime('%Y-%m')
+    typed_df.to_parquet(tmp_target, partition_cols=[PARTITION_COLUMN], index=False)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp_target, target)
+    return target
+
+
+class SalesReportWriter:
+    """Write a cleaned sales report one chunk at a time.
+
+    Chunks go to a temporary file (or dataset directory) that replaces the
+    report only on close(), so readers never see a half-written report.
+    Every chunk is aligned to the same columns.
+    """
+
+    def __init__(self, output_path, columns, storage_format=None):
+        self.columns = columns
+        self.storage_format = resolve_format(storage_format)
+        self.target = output_path if self.storage_format != "parquet" else dataset_path(output_path)
+        self.tmp_target = self.target + ".tmp"
+        self.rows = 0
+        if self.storage_format == "parquet":
+            shutil.rmtree(self.tmp_target, ignore_errors=True)
+            os.makedirs(self.tmp_target)
+        else:
+            pd.DataFrame(columns=columns).to_csv(self.tmp_target, index=False)
+
+    def write(self, df):
+        df = df.reindex(columns=self.columns)
+        if self.storage_format == "parquet":
+            typed_df = apply_schema(df)
+            typed_df[PARTITION_COLUMN] = typed_df['date'].dt.strftime('%Y-%m')
+            typed_df.to_parquet(self.tmp_target, partition_cols=[PARTITION_COLUMN], index=False)
+        else:
+            df.to_csv(self.tmp_target, mode='a', header=False, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self.storage_format == "parquet":
+            shutil.rmtree(self.target, ignore_errors=True)
+        os.replace(self.tmp_target, self.target)
+        return self.target
+
+
+def read_sales_report(output_path, columns=None, storage_format=None):
+    """Read a cleaned sales report, loading only the requested columns."""
+    target = dataset_path(output_path)
+    if resolve_format(storage_format) == "parquet" and os.path.isdir(target):
+        df = pd.read_parquet(target, columns=columns)
+        return df.drop(columns=[PARTITION_COLUMN], errors='ignore') if columns is None else df
+    return pd.read_csv(output_path, usecols=columns)
+
+
+def read_estimation_frame(output_path, storage_format=None, skiprows=None, group_columns=()):
+    """Read only date and product_sales with pinned dtypes and a categorical weekday.
+
+    group_columns, e.g. ['sku', 'ASIN'], are read as well, as categoricals.
+    """
+    columns = ESTIMATION_COLUMNS + list(group_columns)
+    target = dataset_path(output_path)
+    if resolve_format(storage_format) == "parquet" and os.path.isdir(target):
+        df = pd.read_parquet(target, columns=columns)
+    else:
+        df = pd.read_csv(
+            output_path,
+            usecols=columns,
+            dtype={'date': 'object', 'product_sales': 'float64', **{col: 'category' for col in group_columns}},
+            skiprows=skiprows,
+            engine="pyarrow" if pyarrow is not None else "c",
+        )
+        # Only a few thousand distinct dates exist, so parse each one once.
+        codes, unique_dates = pd.factorize(df['date'])
+        df['date'] = pd.to_datetime(unique_dates, format='%Y-%m-%d').take(codes, allow_fill=True, fill_value=pd.NaT)
+
+    weekday_codes = df['date'].dt.dayofweek.fillna(-1).astype('int8')
+    df['weekday'] = pd.Categorical.from_codes(weekday_codes, categories=WEEKDAYS)
+    return df
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import logging
+from contextlib import contextmanager
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+SALES_RESULTS_PATH = r"C:\Users\d.tanubudhi\amazon_sales_estimation\sales-estimation\sales_results.json"
+
+
+@contextmanager
+def file_lock(lock_path, poll_seconds=0.1):
+    """Hold an exclusive lock on lock_path, waiting while another process holds it."""
+    with open(lock_path, 'a+') as f:
+        if msvcrt:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(poll_seconds)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class ResultsStore:
+    """Sales estimation results as an append-only JSON Lines log keyed by report_date and market.
+
+    Saving a day's estimates appends one line per market under a file lock
+    instead of rewriting the whole history, so estimators running at the same
+    time never drop each other's rows. A later line replaces an earlier one
+    for the same report date and market. The legacy sales_results.json is
+    imported the first time the log is used, and compact() rewrites the log
+    without superseded lines; both write a temp file and rename it over the
+    log so readers never see a half-written file.
+    """
+
+    def __init__(self, json_path=SALES_RESULTS_PATH):
+        self.json_path = json_path
+        self.log_path = os.path.splitext(json_path)[0] + ".jsonl"
+        self.lock_path = self.log_path + ".lock"
+
+    @staticmethod
+    def format_line(report_date_key, record):
+        return json.dumps({"report_date": report_date_key, **record}) + "\n"
+
+    def write_log(self, lines):
+        tmp_path = self.log_path + ".tmp"
+        with open(tmp_path, 'w', newline='\n') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.log_path)
+
+    def migrate_legacy_json(self):
+        """Seed the log from sales_results.json when it does not exist yet. Call with the lock held."""
+        if os.path.exists(self.log_path):
+            return
+        lines = []
+        if os.path.exists(self.json_path) and os.path.getsize(self.json_path) > 0:
+            with open(self.json_path, 'r') as f:
+                all_data = json.load(f)
+            lines = [self.format_line(key, record) for key, records in all_data.items() for record in records]
+            logger.info(f"Imported {len(lines)} results from {os.path.basename(self.json_path)}.")
+        self.write_log(lines)
+
+    def read_log(self):
+        """{report_date_key: {market: record}} with the latest line winning. Skips a torn last line."""
+        results = {}
+        with open(self.log_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable line in {os.path.basename(self.log_path)}.")
+                    continue
+                results.setdefault(record.pop("report_date"), {})[record["market"]] = record
+        return results
+
+    def save(self, results):
+        """Append {report_date_key: [records]}, replacing each record's market on that date. Returns the rows written."""
+        lines = [self.format_line(key, record) for key, records in results.items() for record in records]
+        content = "".join(lines).encode()
+        with file_lock(self.lock_path):
+            self.migrate_legacy_json()
+            with open(self.log_path, 'rb+') as f:
+                # A writer that died mid-line leaves no newline; start on a fresh line.
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        content = b"\n" + content
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+        return len(lines)
+
+    def load(self):
+        """All results in the sales_results.json layout: {report_date_key: [records]}."""
+        with file_lock(self.lock_path):
+            self.migrate_legacy_json()
+            results = self.read_log()
+        return {key: list(records.values()) for key, records in results.items()}
+
+    def compact(self):
+        """Rewrite the log with only the latest line per report date and market."""
+        with file_lock(self.lock_path):
+            self.migrate_legacy_json()
+            results = self.read_log()
+            self.write_log([self.format_line(key, record) for key, records in results.items() for record in records.values()])
+        logger.info(f"Compacted {os.path.basename(self.log_path)} to {sum(len(r) for r in results.values())} results.")
@@ -0,0 +1,17 @@
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def run_with_retries(func, max_attempts=5, delay=3, description="task"):
+    """Call func until it succeeds, sleeping between attempts. Re-raises the last error."""
+    for attempt in range(1, max_attempts + 1):
+        logger.info(f"Attempt #{attempt} of {description}...")
+        try:
+            return func()
+        except Exception as e:
+            logger.warning(f"Attempt #{attempt} of {description} failed: {e}")
+            if attempt == max_attempts:
+                raise
+            time.sleep(delay)
@@ -0,0 +1,36 @@
+import logging
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# One handler per log file, shared by the scripts that write to the same file.
+_file_handlers = {}
+
+
+def configure_script_logging(name, log_path, stream=None):
+    """Return the logger for a script that writes to log_path, run on its own or loaded by the pipeline.
+
+    Run on its own, the script configures the root logger as it always has, so
+    the log file also holds the messages of the common modules it uses. When a
+    runner such as uploads/pipeline.py has already configured the root logger,
+    basicConfig would do nothing, so the file handler goes on the script's own
+    logger instead; its records still propagate to the runner's log.
+    """
+    if not logging.getLogger().handlers:
+        logging.basicConfig(
+            level=logging.INFO,
+            format=LOG_FORMAT,
+            handlers=[
+                logging.FileHandler(log_path, encoding='utf-8'),
+                logging.StreamHandler(stream)]
+        )
+        return logging.getLogger(name)
+
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    if log_path not in _file_handlers:
+        handler = logging.FileHandler(log_path, encoding='utf-8')
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        _file_handlers[log_path] = handler
+    if _file_handlers[log_path] not in logger.handlers:
+        logger.addHandler(_file_handlers[log_path])
+    return logger
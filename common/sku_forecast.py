@@ -0,0 +1,59 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+from common.weekday_averages import grouped_cascading_weekday_averages
+from common.panel_estimation import report_month, month_end_estimates
+
+logger = logging.getLogger(__name__)
+
+FORECAST_COLUMNS = ['actual_sales', 'estimated_sales', 'total_estimation']
+
+
+def daily_sales_matrix(df, group_columns):
+    """(date x group) matrix of daily product_sales, zero where a group sold nothing.
+
+    Rows are every day present in df, the same days the market-level daily
+    totals have. Rows without a SKU keep a group of their own so the groups
+    still add up to the market.
+    """
+    grouped = df.groupby(['date', *group_columns], observed=True, dropna=False)['product_sales'].sum()
+    matrix = grouped.unstack(group_columns, fill_value=0.0)
+    days = pd.DatetimeIndex(df['date'].dropna().unique()).sort_values()
+    return matrix.reindex(days, fill_value=0.0)
+
+
+def month_end_forecast(daily_matrix, cutoff_date):
+    """Month-end forecast for every column of a daily matrix, under the month-end rules of common.panel_estimation."""
+    dates = pd.DatetimeIndex(daily_matrix.index)
+    report_date, month_start, month_end = report_month(cutoff_date)
+
+    actual = daily_matrix[(dates >= month_start) & (dates <= report_date)].sum().to_numpy()
+    if report_date == month_end:
+        weekday_avgs = np.zeros((len(daily_matrix.columns), 7))
+    else:
+        weekday_avgs = grouped_cascading_weekday_averages(daily_matrix[dates <= report_date]).to_numpy().T
+    return month_end_estimates(actual, weekday_avgs, cutoff_date, index=daily_matrix.columns)
+
+
+def grouped_month_end_forecast(df, group_columns, cutoff_date):
+    """Month-end forecast per group (e.g. per SKU and ASIN) from cleaned report rows, one row per group."""
+    forecast = month_end_forecast(daily_sales_matrix(df, group_columns), cutoff_date)
+    return forecast.reset_index().sort_values('total_estimation', ascending=False, ignore_index=True)
+
+
+def save_grouped_results(path, report_date_key, market, forecast):
+    """Replace this market's rows for report_date_key in the grouped results CSV."""
+    forecast = forecast.assign(report_date=report_date_key, market=market)
+    forecast = forecast[['report_date', 'market'] + [col for col in forecast.columns if col not in ('report_date', 'market')]]
+    rows = len(forecast)
+
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        existing = pd.read_csv(path, dtype=str)
+        keep = ~((existing['report_date'] == report_date_key) & (existing['market'] == market))
+        forecast = pd.concat([existing[keep], forecast], ignore_index=True)
+
+    tmp_path = path + ".tmp"
+    forecast.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved {rows} grouped estimation rows for {market} to {os.path.basename(path)}.")
@@ -0,0 +1,65 @@
+import re
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Zone suffixes Seller Central appends to report timestamps. UTC/GMT times are
+# converted; PST/PDT label wall time in the report's own zone, and only decide
+# which of the two 1 AM hours is meant when clocks fall back.
+UTC_ZONES = ("UTC", "GMT")
+DAYLIGHT_ZONES = {"PST": False, "PDT": True}
+# Splits "<wall time> <zone>" in one pass; zone is NaN when there is no known suffix.
+ZONE_SUFFIX = re.compile(r"^(?P<wall>.*?)(?:\s+(?P<zone>" + "|".join([*UTC_ZONES, *DAYLIGHT_ZONES]) + r"))?\s*$")
+
+# Formats of the date/time column in the US date range reports, e.g. "Jan 5, 2025 1:02:03 AM PST".
+US_REPORT_DATE_FORMAT = "%b %d, %Y %I:%M:%S %p"
+US_REPORT_TIMEZONE = "America/Los_Angeles"
+
+_month_patterns = {}
+
+
+def month_pattern(month_names):
+    """One compiled alternation for all of a locale's month names, longest first so 'sept.' beats 'sep'."""
+    key = tuple(sorted(month_names))
+    if key not in _month_patterns:
+        names = sorted(month_names, key=len, reverse=True)
+        _month_patterns[key] = re.compile(r"(?<=\d\s)(" + "|".join(map(re.escape, names)) + r")(?=\s)")
+    return _month_patterns[key]
+
+
+def parse_report_timestamps(values, date_format, month_names=None, tz="UTC", dayfirst=False):
+    """Parse a report's timestamp column into timezone-aware values in tz.
+
+    Localized month names are translated to English with one regex pass and
+    the trailing zone is split off: UTC times are converted to tz, while
+    PST/PDT and unlabelled times are wall time in tz, so the date and time
+    the report prints are the ones we keep. All string work and parsing runs
+    once per distinct timestamp, so batch refunds and settlement lines sharing
+    a time cost nothing extra. Rows that don't match date_format fall back to
+    pandas' per-row inference, reading ambiguous dates day first only when
+    dayfirst is set, and are logged, so an unexpected layout degrades speed
+    rather than dropping rows.
+    """
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques, dtype=object).astype(str)
+    if month_names:
+        text = text.str.replace(month_pattern(month_names), lambda m: month_names[m.group(0)], regex=True)
+    parts = text.str.extract(ZONE_SUFFIX)
+    text, zones = parts["wall"], parts["zone"]
+
+    wall = pd.to_datetime(text, format=date_format, errors='coerce')
+    unmatched = wall.isna()
+    if unmatched.any():
+        logger.warning(f"{unmatched.sum()} timestamps don't match '{date_format}', e.g. '{text[unmatched].iloc[0]}'. Inferring their format.")
+        wall[unmatched] = pd.to_datetime(text[unmatched], format='mixed', dayfirst=dayfirst, errors='coerce')
+
+    in_utc = zones.isin(UTC_ZONES)
+    parsed = pd.Series(pd.NaT, index=text.index, dtype=f"datetime64[ns, {tz}]")
+    if in_utc.any():
+        parsed[in_utc] = wall[in_utc].dt.tz_localize("UTC").dt.tz_convert(tz)
+    if (~in_utc).any():
+        daylight = zones[~in_utc].map(DAYLIGHT_ZONES).fillna(False).to_numpy(dtype=bool)
+        parsed[~in_utc] = wall[~in_utc].dt.tz_localize(tz, ambiguous=daylight, nonexistent='shift_forward')
+
+    return pd.Series(pd.DatetimeIndex(parsed).take(codes, allow_fill=True, fill_value=pd.NaT), index=values.index, name=values.name)
@@ -0,0 +1,167 @@
+import logging
+import numpy as np
+import pandas as pd
+from common.report_storage import WEEKDAYS
+
+logger = logging.getLogger(__name__)
+
+# Only the seven most recent occurrences of each weekday feed the averages.
+WINDOW_DEPTH = 7
+
+
+def daily_sales_totals(df_estimation, cutoff_date):
+    """Total product_sales per calendar day strictly before the cutoff date."""
+    df_filtered = df_estimation[df_estimation['date'] < cutoff_date]
+    return df_filtered.groupby('date')['product_sales'].sum()
+
+
+def window_points(v, counts):
+    """Sum of the available cascading windows and how many there are.
+
+    v[i] holds the i-th most recent value (zero when missing) and counts the
+    number of days of history behind it, both as aligned arrays.
+    """
+    windows = [
+        (((v[0] + v[1]) + v[2]) + v[3]) / 4,
+        (((v[1] + v[2]) + v[3]) + v[4]) / 4,
+        (((v[2] + v[3]) + v[4]) + v[5]) / 4,
+        ((((v[3] + v[4]) + v[5]) + v[6]) + v[0]) / 4,
+    ]
+    n_points = np.clip(counts - 3, 0, 4)
+
+    points_sum = np.zeros(np.shape(counts))
+    for i, window in enumerate(windows):
+        points_sum = points_sum + np.where(n_points > i, window, 0.0)
+    return points_sum, n_points
+
+
+def cascading_weekday_averages(daily_sales):
+    """Cascading 4-day averages for every weekday in one pass over daily totals.
+
+    For each weekday the most recent occurrences v0, v1, ... (newest first)
+    are combined into up to four overlapping windows, and the weekday average
+    is the mean of the windows that have enough history:
+
+        (v0 + v1 + v2 + v3) / 4
+        (v1 + v2 + v3 + v4) / 4
+        (v2 + v3 + v4 + v5) / 4
+        (v3 + v4 + v5 + v6 + v0) / 4
+
+    The last window intentionally keeps the historical five-value sum so the
+    estimates stay identical to previously reported numbers. Additions are
+    done in the same order as the original per-weekday loop, so results match
+    to the last bit. Weekdays with fewer than four days of history get 0.0.
+    """
+    daily_sales = daily_sales.sort_index(ascending=False)
+    dates = pd.DatetimeIndex(daily_sales.index)
+    values = daily_sales.to_numpy(dtype='float64')
+
+    weekday_codes = dates.dayofweek.to_numpy()
+    ranks = pd.Series(weekday_codes).groupby(weekday_codes).cumcount().to_numpy()
+    counts = np.bincount(weekday_codes, minlength=7)
+
+    recent = ranks < WINDOW_DEPTH
+    matrix = np.zeros((7, WINDOW_DEPTH))
+    matrix[weekday_codes[recent], ranks[recent]] = values[recent]
+    points_sum, n_points = window_points([matrix[:, i] for i in range(WINDOW_DEPTH)], counts)
+
+    weekday_avgs = {}
+    # Report weekdays in order of their most recent occurrence, like the old loop did.
+    for code in pd.unique(weekday_codes):
+        weekday = WEEKDAYS[code]
+        if n_points[code]:
+            avg_total = round(points_sum[code] / n_points[code], 2)
+            weekday_avgs[weekday] = avg_total
+            logger.info(f"{weekday} rolling avg from {n_points[code]} combinations: {avg_total}")
+        else:
+            logger.warning(f"Not enough records for {weekday} to compute cascading 4-day average.")
+            weekday_avgs[weekday] = 0.0
+
+    return pd.Series(weekday_avgs, dtype='float64')
+
+
+def grouped_cascading_weekday_averages(daily_matrix):
+    """cascading_weekday_averages() for every column of a (date x group) matrix in one pass.
+
+    All columns share the matrix's days, with zero where a group sold
+    nothing, so the window counts are the same for every group and the
+    windows of all groups come out of a single (weekday x rank x group)
+    array. Returns a (weekday x group) DataFrame, Monday first, with 0.0 for
+    weekdays lacking history. Because the windows are sums, the columns add
+    up to the averages of the matrix's row totals.
+    """
+    daily_matrix = daily_matrix.sort_index(ascending=False)
+    dates = pd.DatetimeIndex(daily_matrix.index)
+    values = daily_matrix.to_numpy(dtype='float64')
+
+    weekday_codes = dates.dayofweek.to_numpy()
+    ranks = pd.Series(weekday_codes).groupby(weekday_codes).cumcount().to_numpy()
+    counts = np.bincount(weekday_codes, minlength=7)
+
+    recent = ranks < WINDOW_DEPTH
+    tensor = np.zeros((7, WINDOW_DEPTH, values.shape[1]))
+    tensor[weekday_codes[recent], ranks[recent]] = values[recent]
+    points_sum, n_points = window_points([tensor[:, i] for i in range(WINDOW_DEPTH)], counts[:, None])
+
+    averages = np.round(np.where(n_points > 0, points_sum / np.maximum(n_points, 1), 0.0), 2)
+    return pd.DataFrame(averages, index=WEEKDAYS, columns=daily_matrix.columns)
+
+
+def panel_cascading_weekday_averages(daily_panel):
+    """cascading_weekday_averages() for every market of a (market, date) panel of daily totals in one pass.
+
+    Unlike grouped_cascading_weekday_averages(), each market keeps its own
+    days: occurrences are ranked and counted per (market, weekday), so every
+    row equals cascading_weekday_averages() on that market alone. Returns a
+    (market x weekday) DataFrame, Monday first, with 0.0 for weekdays
+    lacking history.
+    """
+    daily_panel = daily_panel.sort_index(level=[0, 1], ascending=[True, False])
+    market_codes, markets = pd.factorize(daily_panel.index.get_level_values(0))
+    dates = pd.DatetimeIndex(daily_panel.index.get_level_values(1))
+    values = daily_panel.to_numpy(dtype='float64')
+
+    weekday_codes = dates.dayofweek.to_numpy()
+    slots = market_codes * 7 + weekday_codes
+    ranks = pd.Series(slots).groupby(slots).cumcount().to_numpy()
+    counts = np.bincount(slots, minlength=len(markets) * 7).reshape(len(markets), 7)
+
+    recent = ranks < WINDOW_DEPTH
+    tensor = np.zeros((len(markets), 7, WINDOW_DEPTH))
+    tensor[market_codes[recent], weekday_codes[recent], ranks[recent]] = values[recent]
+    points_sum, n_points = window_points([tensor[:, :, i] for i in range(WINDOW_DEPTH)], counts)
+
+    averages = np.round(np.where(n_points > 0, points_sum / np.maximum(n_points, 1), 0.0), 2)
+    return pd.DataFrame(averages, index=markets, columns=WEEKDAYS)
+
+
+def get_dynamic_last_4_day_averages(df_estimation, cutoff_date):
+    """Rolling 4-day cascading averages for each weekday before the cutoff date."""
+    return cascading_weekday_averages(daily_sales_totals(df_estimation, cutoff_date))
+
+
+def rolling_cascading_weekday_averages(daily_sales, cutoff_dates):
+    """Cascading weekday averages for many cutoff dates at once.
+
+    Returns an array of shape (len(cutoff_dates), 7) indexed by day of week,
+    Monday first. Each row equals cascading_weekday_averages() on the days
+    strictly before that cutoff, with 0.0 for weekdays lacking history.
+    """
+    daily_sales = daily_sales.sort_index()
+    dates = pd.DatetimeIndex(daily_sales.index)
+    values = daily_sales.to_numpy(dtype='float64')
+    weekday_codes = dates.dayofweek.to_numpy()
+    cutoffs = pd.DatetimeIndex(cutoff_dates)
+
+    averages = np.zeros((len(cutoffs), 7))
+    for code in range(7):
+        mask = weekday_codes == code
+        history = np.concatenate([np.zeros(WINDOW_DEPTH), values[mask]])
+        # Number of occurrences of this weekday strictly before each cutoff.
+        counts = dates[mask].searchsorted(cutoffs, side='left')
+        v = [history[counts - 1 - i + WINDOW_DEPTH] for i in range(WINDOW_DEPTH)]
+
+        points_sum, n_points = window_points(v, counts)
+        averages[:, code] = np.round(np.where(n_points > 0, points_sum / np.maximum(n_points, 1), 0.0), 2)
+
+    return averages
@@ -1,25 +1,28 @@
 import os
 import re
-import json
 import sys
+import argparse
 import warnings
 import pandas as pd
-import logging
 from datetime import datetime, timedelta, date
-from pandas.errors import ParserError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.master_store import MasterStore
+from common.report_storage import write_sales_report, encode_categoricals, read_estimation_frame
+from common.daily_aggregates import DailyAggregateStore, load_daily_sales
+from common.panel_estimation import month_end_estimate
+from common.backfill import backfill_estimates
+from common.results_store import ResultsStore
+from common.sku_forecast import grouped_month_end_forecast, save_grouped_results
+from common.timestamps import parse_report_timestamps, US_REPORT_DATE_FORMAT, US_REPORT_TIMEZONE
+from common.chunked_cleaning import CHUNK_ROWS, clean_master_in_chunks
+from common.script_logging import configure_script_logging
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 warnings.simplefilter(action='ignore', category=UserWarning)
 
 # LOGGING CONFIGURATION
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\sales_estimation_report.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)]
-)
-logger = logging.getLogger(__name__)
+logger = configure_script_logging(__name__, r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\sales_estimation_report.log', sys.stdout)
 
 class SalesEstimation:
     def __init__(self):
@@ -27,6 +30,12 @@ class SalesEstimation:
         self.report_folder = r'C:\Users\d.tanubudhi\amazon_sales_estimation\reports\enzyme-science-reports'
         self.material_master_path = r"C:\Users\d.tanubudhi\amazon_sales_estimation\reports\Enzymedica - Material Master 03172025.xlsx"
         self.output_path = r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\ReportFiles\EnzymeScienceSalesReport.csv"
+        self.results_store = ResultsStore()
+        self.sku_results_path = r"C:\Users\d.tanubudhi\amazon_sales_estimation\sales-estimation\sku_results.csv"
+        self.sku_columns = ['sku']
+        self.market = "Enzyme Science US"
+        self.master_store = MasterStore(self.master_file)
+        self.daily_store = DailyAggregateStore.for_report(self.output_path)
 
     def append_latest_report_master_file(self):
         FILE_PATTERN = re.compile(r"(\d{4}[A-Za-z]{3}\d{1,2})-(\d{4}[A-Za-z]{3}\d{1,2})CustomTransaction\.csv")
@@ -43,25 +52,14 @@ class SalesEstimation:
         latest_file = max(matching_files_paths, key=os.path.getmtime)
         logger.info(f"Latest downloaded file: {latest_file}")
 
-        try:
-            master_df = pd.read_csv(self.master_file, low_memory=False)
-        except ParserError as e:
-            if "Expected 1 fields in line 8" in str(e):
-                master_df = pd.read_csv(self.master_file, skiprows=7, low_memory=False)
-                logger.warning("ParserError encountered. Retried reading file with skiprows=7.")
-            else:
-                raise e
-
-        new_df = pd.read_csv(latest_file, skiprows=7)
-        combined_df = pd.concat([master_df, new_df], ignore_index=True)
-        combined_df.to_csv(self.master_file, index=False)
-        logger.info("Appended latest report to master successfully.")
-
-    def data_cleaning_on_master_file(self):
-        df = pd.read_csv(self.master_file)
+        if self.master_store.append_report(latest_file, skiprows=7):
+            logger.info("Appended latest report to master successfully.")
+
+    def clean_transactions(self, df):
+        """Rename and parse a block of master rows into the cleaned report layout."""
         df.columns = df.columns.str.replace(' ', '_').str.replace('/', '_')
         df = df.loc[:, ~df.columns.duplicated()]  # remove dupes
-        df["date_time"] = pd.to_datetime(df["date_time"].astype(str).str.replace(" PST", "", regex=False))
+        df["date_time"] = parse_report_timestamps(df["date_time"], US_REPORT_DATE_FORMAT, tz=US_REPORT_TIMEZONE)
 
         df["date"] = df["date_time"].dt.date
         df["time"] = df["date_time"].dt.time
@@ -92,128 +90,92 @@ class SalesEstimation:
             'selling_fees', 'fba_fees', 'other_transaction_fees', 'other', 'total'
             ]
 
+        encode_categoricals(df)
         existing_columns = [col for col in rearrange_columns if col in df.columns]
-        df = df[existing_columns]
-
-        df.to_csv(self.output_path, index=False)
+        return df[existing_columns]
+
+    def data_cleaning_on_master_file(self, chunk_rows=CHUNK_ROWS):
+        """Clean the master into the sales report. With chunk_rows, stream it in blocks of that many rows."""
+        # Both paths read the master as text, so the chunk size never changes
+        # how ids, postal codes or amounts are typed before cleaning.
+        if chunk_rows:
+            daily = clean_master_in_chunks(
+                self.master_store, self.clean_transactions, self.output_path, self.daily_store, chunk_rows, dtype=str
+            )
+        else:
+            df = self.clean_transactions(self.master_store.read(dtype=str))
+            write_sales_report(df, self.output_path)
+            daily = self.daily_store.update(df, self.master_store)
         logger.info("Cleaned and saved report for sales estimation.")
+        return daily
 
-    def sales_estimation(self, selected_date):
-        df = pd.read_csv(self.output_path)
-        df['date'] = pd.to_datetime(df['date'])
-
-        df_day_sales = df[['date', 'time', 'weekday', 'sku', 'description', 'product_sales']].copy()
-        df_day_sales['product_sales'] = df_day_sales['product_sales'].astype(float)
-        df_day_sales['weekday'] = df_day_sales['date'].dt.day_name()
+    def sales_estimation(self, selected_date, daily=None):
+        if daily is None:
+            daily = load_daily_sales(self.output_path, self.master_store)
+        daily_sales = daily.set_index('date')['sales']
 
         today = datetime.today()
         cutoff_date = datetime(today.year, today.month, selected_date)
         report_date = cutoff_date - timedelta(days=1)
-        month_start = report_date.replace(day=1)
-
-        df_actual = df_day_sales[
-            (df_day_sales['date'] >= month_start) &
-            (df_day_sales['date'] <= report_date)
-        ]
-        actual_sales_to_date = df_actual['product_sales'].sum()
-
-        logger.info(f"Actual sales from earliest record to {cutoff_date.date() - timedelta(days=1)}: {actual_sales_to_date:,.2f}")
-
-        # Rolling 4-day cascading averages for each weekday
-        def get_dynamic_last_4_day_averages(df_estimation, cutoff_date):
-            df_filtered = df_estimation[df_estimation['date'] < cutoff_date].copy()
-            df_filtered['date'] = pd.to_datetime(df_filtered['date'])
-            df_filtered['weekday'] = df_filtered['date'].dt.day_name()
-
-            df_grouped = (
-                df_filtered.groupby(['date', 'weekday'])['product_sales']
-                .sum()
-                .reset_index()
-                .sort_values(by='date', ascending=False)
-                .reset_index(drop=True)
-            )
 
-            weekday_avgs = {}
-
-            for weekday in df_grouped['weekday'].unique():
-                weekday_rows = df_grouped[df_grouped['weekday'] == weekday].reset_index(drop=True)
-                points = []
-
-                if len(weekday_rows) >= 4:
-                    points.append(weekday_rows.loc[0:3, 'product_sales'].mean())
-                if len(weekday_rows) >= 5:
-                    vals = list(weekday_rows.loc[1:3, 'product_sales']) + [weekday_rows.loc[4, 'product_sales']]
-                    points.append(sum(vals) / 4)
-                if len(weekday_rows) >= 6:
-                    vals = list(weekday_rows.loc[2:3, 'product_sales']) + list(weekday_rows.loc[4:5, 'product_sales'])
-                    points.append(sum(vals) / 4)
-                if len(weekday_rows) >= 7:
-                    vals = [weekday_rows.loc[3, 'product_sales']] + list(weekday_rows.loc[4:6, 'product_sales']) + [weekday_rows.loc[0, 'product_sales']]
-                    points.append(sum(vals) / 4)
-
-                if points:
-                    avg_total = round(sum(points) / len(points), 2)
-                    weekday_avgs[weekday] = avg_total
-                    logger.info(f"{weekday} rolling avg from {len(points)} combinations: {avg_total}")
-                else:
-                    logger.warning(f"Not enough records for {weekday} to compute cascading 4-day average.")
-                    weekday_avgs[weekday] = 0.0
-
-            return pd.Series(weekday_avgs)
-
-        weekday_avg_sales = get_dynamic_last_4_day_averages(df_day_sales, cutoff_date)
-
-        report_month_end = report_date.replace(day=1) + pd.offsets.MonthEnd(0)
-        is_last_day = report_date.date() == report_month_end.date()
-
-        logger.info(f"Report date: {report_date.date()}, Month end: {report_month_end.date()}, Is last day? {is_last_day}")
-
-        if not is_last_day:
-            remaining_days = pd.date_range(start=cutoff_date, end=report_month_end)
-            remaining_weekdays = remaining_days.day_name()
-            remaining_sales_estimate = pd.Series(remaining_weekdays.map(weekday_avg_sales)).fillna(0).sum()
-            total_estimation = actual_sales_to_date + remaining_sales_estimate
-        else:
-            logger.info("Report is for the last day of the month. Using actuals only.")
-            remaining_sales_estimate = 0
-            total_estimation = actual_sales_to_date
-
-        result = {
-            "market": "Enzyme Science US",
-            "actual_sales": round(actual_sales_to_date, 2),
-            "estimated_sales": round(remaining_sales_estimate, 2),
-            "total_estimation": round(total_estimation, 2)
-        }
+        # Actuals stop at the report date; the cutoff date (today's partial sales) is forecast instead.
+        result = month_end_estimate(daily_sales, cutoff_date, self.market)
+        logger.info(f"Actual sales to {report_date.date()}: {result['actual_sales']:,.2f}, estimated for the rest of the month: {result['estimated_sales']:,.2f}")
 
         # Save to JSON
-        report_date = cutoff_date - timedelta(days=1)
         report_date_key = report_date.strftime("%Y-%m-%d")
-        output_path = r"C:\Users\d.tanubudhi\amazon_sales_estimation\sales-estimation\sales_results.json"
-        try:
-            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                with open(output_path, 'r') as f:
-                    all_data = json.load(f)
-            else:
-                all_data = {}
+        self.save_results({report_date_key: result})
+
+        return result
 
-            if report_date_key  not in all_data:
-                all_data[report_date_key] = []
+    def sku_estimation(self, selected_date):
+        """The month-end forecast per SKU, saved to sku_results.csv next to sales_results.json."""
+        today = datetime.today()
+        cutoff_date = datetime(today.year, today.month, selected_date)
+        report_date = cutoff_date - timedelta(days=1)
 
-            all_data[report_date_key] = [x for x in all_data[report_date_key] if x["market"] != result["market"]]
-            all_data[report_date_key].append(result)
+        df = read_estimation_frame(self.output_path, group_columns=self.sku_columns)
+        forecast = grouped_month_end_forecast(df, self.sku_columns, cutoff_date)
+        logger.info(f"Estimated {len(forecast)} SKUs for {report_date.date()}, totalling {forecast['total_estimation'].sum():,.2f}.")
 
-            with open(output_path, 'w') as f:
-                json.dump(all_data, f, indent=2)
+        save_grouped_results(self.sku_results_path, report_date.strftime("%Y-%m-%d"), self.market, forecast)
+        return forecast
 
-            logger.info(f"Saved sales estimation for {result['market']} to JSON.")
+    def backfill(self, start_date, end_date):
+        """Recompute estimates for every report date in a range and save them in one write."""
+        daily_sales = load_daily_sales(self.output_path, self.master_store).set_index('date')['sales']
+        estimates = backfill_estimates(daily_sales, start_date, end_date)
+
+        results = {key: {"market": self.market, **values} for key, values in estimates.items()}
+        self.save_results(results)
+        self.results_store.compact()
+        return results
+
+    def save_results(self, results):
+        """Save {report_date_key: result} to the results store, replacing this market's entries."""
+        try:
+            self.results_store.save({report_date_key: [result] for report_date_key, result in results.items()})
+            logger.info(f"Saved {len(results)} sales estimation(s) for {self.market}.")
         except Exception as e:
-            logger.error(f"Failed to write JSON: {e}")
+            logger.error(f"Failed to save sales estimation results: {e}")
+
 
-        return result
-    
 if __name__ == "__main__":
-    logger.info("Sales Estimation Report started.")
-    estimator = SalesEstimation()
-    estimator.append_latest_report_master_file()
-    estimator.data_cleaning_on_master_file()
-    estimator.sales_estimation(selected_date=datetime.today().day)
+    parser = argparse.ArgumentParser(description="Enzyme Science US sales estimation.")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"),
+                        help="Recompute estimates for every report date from START to END (YYYY-MM-DD).")
+    parser.add_argument("--by-sku", action="store_true",
+                        help="Also write the month-end forecast per SKU to sku_results.csv.")
+    args = parser.parse_args()
+
+    if args.backfill:
+        logger.info(f"Sales Estimation backfill started for {args.backfill[0]} to {args.backfill[1]}.")
+        SalesEstimation().backfill(*args.backfill)
+    else:
+        logger.info("Sales Estimation Report started.")
+        estimator = SalesEstimation()
+        estimator.append_latest_report_master_file()
+        estimator.data_cleaning_on_master_file()
+        estimator.sales_estimation(selected_date=datetime.today().day)
+        if args.by_sku:
+            estimator.sku_estimation(selected_date=datetime.today().day)
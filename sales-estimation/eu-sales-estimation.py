@@ -1,157 +1,141 @@
 import os
 import sys
-import json
+import argparse
 import warnings
-import pandas as pd
-import logging
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.master_store import MasterStore
+from common.daily_aggregates import load_daily_sales
+from common.panel_estimation import month_end_estimate
+from common.backfill import backfill_estimates
+from common.results_store import ResultsStore
+from common.script_logging import configure_script_logging
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 warnings.simplefilter(action='ignore', category=UserWarning)
 
 # LOGGING CONFIGURATION
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\sales_estimation_report.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)]
-)
-logger = logging.getLogger(__name__)
+logger = configure_script_logging(__name__, r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\sales_estimation_report.log', sys.stdout)
 
 class SalesEstimation:
-    def __init__(self):
+    def __init__(self, max_workers=4, executor="thread"):
         self.master_files = {
             "Germany": r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\ReportFiles\GermanySalesReport.csv",
             "Italy": r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\ReportFiles\ItalySalesReport.csv",
             "France": r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\ReportFiles\FranceSalesReport.csv",
             "Spain": r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\ReportFiles\SpainSalesReport.csv"
         }
+        # Countries are estimated concurrently; max_workers=1 runs them one after another.
+        self.max_workers = max_workers
+        self.executor = executor
+        self.results_store = ResultsStore()
+        # Daily aggregates already in memory, e.g. handed over by the pipeline runner.
+        self.daily_by_country = {}
+        # Transaction masters the cleaned reports are built from, used to validate the daily aggregates.
+        self.master_stores = {
+            "Germany": MasterStore(r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\MasterFiles\GermanyCustomTransaction.csv"),
+            "Italy": MasterStore(r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\MasterFiles\ItalyCustomTransaction.csv"),
+            "France": MasterStore(r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\MasterFiles\FranceCustomTransaction.csv"),
+            "Spain": MasterStore(r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\MasterFiles\SpainCustomTransaction.csv")
+        }
 
     def multi_country_sales_estimation(self, selected_date):
         today = datetime.today()
         cutoff_date = datetime(today.year, today.month, selected_date)
         report_date = cutoff_date - timedelta(days=1)
-        month_start = report_date.replace(day=1)
-        month_end = pd.Timestamp(month_start) + pd.offsets.MonthEnd(1)
-
-        output_path = r"C:\Users\d.tanubudhi\amazon_sales_estimation\sales-estimation\sales_results.json"
-        all_results = []
-
-        for country, file_path in self.master_files.items():
-            try:
-                try:
-                    df = pd.read_csv(file_path)
-                except pd.errors.ParserError as e:
-                    logger.warning(f"{country} file failed with skiprows=7. Retrying without skiprows.")
-                    df = pd.read_csv(file_path, skiprows=7)
-                except Exception as e:
-                    logging.error(f"{country} file could not be read at all: {e}")
-                    continue
-                
-                df['date'] = pd.to_datetime(df['date'])  
-                
-
-                df_day_sales = df[['date', 'time', 'weekday', 'sku', 'description', 'product_sales']].copy()
-                df_day_sales['product_sales'] = df_day_sales['product_sales'].astype(float)
-                df_day_sales['weekday'] = df_day_sales['date'].dt.day_name()
-
-                # Actual sales: strictly before the cutoff date (excluding today's partial sales)
-                df_actual = df_day_sales[
-                    (df_day_sales['date'] >= month_start) &
-                    (df_day_sales['date'] <= report_date)
-                ]
-                actual_sales_to_date = df_actual['product_sales'].sum()
-
-                def get_dynamic_last_4_day_averages(df_estimation, cutoff_date):
-                    df_filtered = df_estimation[df_estimation['date'] < cutoff_date].copy()
-                    df_filtered['weekday'] = df_filtered['date'].dt.day_name()
-
-                    df_grouped = (
-                        df_filtered.groupby(['date', 'weekday'])['product_sales']
-                        .sum()
-                        .reset_index()
-                        .sort_values(by='date', ascending=False)
-                        .reset_index(drop=True)
-                    )
-
-                    weekday_avgs = {}
-
-                    for weekday in df_grouped['weekday'].unique():
-                        weekday_rows = df_grouped[df_grouped['weekday'] == weekday].reset_index(drop=True)
-
-                        if len(weekday_rows) >= 4:
-                            points = []
-                            points.append(weekday_rows.loc[0:3, 'product_sales'].mean())
-                            if len(weekday_rows) >= 5:
-                                vals = list(weekday_rows.loc[1:3, 'product_sales']) + [weekday_rows.loc[4, 'product_sales']]
-                                points.append(sum(vals) / 4)
-                            if len(weekday_rows) >= 6:
-                                vals = list(weekday_rows.loc[2:3, 'product_sales']) + list(weekday_rows.loc[4:5, 'product_sales'])
-                                points.append(sum(vals) / 4)
-                            if len(weekday_rows) >= 7:
-                                vals = [weekday_rows.loc[3, 'product_sales']] + list(weekday_rows.loc[4:6, 'product_sales']) + [weekday_rows.loc[0, 'product_sales']]
-                                points.append(sum(vals) / 4)
-
-                            weekday_avgs[weekday] = round(sum(points) / len(points), 2)
-
-                    return pd.Series(weekday_avgs)
-
-                weekday_avg_sales = get_dynamic_last_4_day_averages(df_day_sales, cutoff_date)
-                report_month_end = report_date.replace(day=1) + pd.offsets.MonthEnd(0)
-                is_last_day = report_date.date() == report_month_end.date()
-
-                logger.info(f"Report date: {report_date.date()}, Month end: {report_month_end.date()}, Is last day? {is_last_day}")
-
-                if not is_last_day:
-                    remaining_days = pd.date_range(start=cutoff_date, end=report_month_end)
-                    remaining_weekdays = remaining_days.day_name()
-                    remaining_sales_estimate = pd.Series(remaining_weekdays.map(weekday_avg_sales)).fillna(0).sum()
-                    total_estimation = actual_sales_to_date + remaining_sales_estimate
-                else:
-                    logger.info("Report is for the last day of the month. Using actuals only.")
-                    remaining_sales_estimate = 0
-                    total_estimation = actual_sales_to_date
-
-                result = {
-                    "market": f"Enzymedica EU - {country}",
-                    "actual_sales": round(actual_sales_to_date, 2),
-                    "estimated_sales": round(remaining_sales_estimate, 2),
-                    "total_estimation": round(total_estimation, 2)
-                }
-
-                all_results.append(result)
-
-            except Exception as e:
-                logger.warning(f"Error processing {country}: {e}")
 
+        country_results = self.run_per_country(self.estimate_country, cutoff_date)
+        all_results = [result for result in country_results.values() if result is not None]
+
+        self.save_results({report_date.strftime("%Y-%m-%d"): all_results})
+        return all_results
+
+    def run_per_country(self, func, *args):
+        """Run func(country, file_path, *args) for every country, concurrently when configured.
+
+        Results are returned in self.master_files order regardless of which
+        country finishes first, so the JSON output stays deterministic.
+        """
+        countries = list(self.master_files.items())
+        if self.max_workers <= 1:
+            return {country: func(country, file_path, *args) for country, file_path in countries}
+
+        pool_class = ProcessPoolExecutor if self.executor == "process" else ThreadPoolExecutor
+        with pool_class(max_workers=self.max_workers) as pool:
+            futures = {country: pool.submit(func, country, file_path, *args) for country, file_path in countries}
+            return {country: futures[country].result() for country, _ in countries}
+
+    def estimate_country(self, country, file_path, cutoff_date):
+        """Month-end estimate for one country, or None when it cannot be computed."""
         try:
-            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                with open(output_path, 'r') as f:
-                    all_data = json.load(f)
-            else:
-                all_data = {}
-
-            report_date_key = report_date.strftime("%Y-%m-%d")
-            if report_date_key not in all_data:
-                all_data[report_date_key] = []
-
-            # Remove old Enzymedica EU entries from that date
-            all_data[report_date_key] = [
-                x for x in all_data[report_date_key]
-                if not x["market"].startswith("Enzymedica EU")
-            ]
-
-            # Append new EU results under the correct key
-            all_data[report_date_key].extend(all_results)
-
-            with open(output_path, 'w') as f:
-                json.dump(all_data, f, indent=2)
-            logger.info(f"Saved all EU sales estimation results to {output_path}")
+            daily_sales = self.load_country_daily_sales(country, file_path)
+            if daily_sales is None:
+                return None
+            return month_end_estimate(daily_sales, cutoff_date, f"Enzymedica EU - {country}")
+
         except Exception as e:
-            logger.error(f"Failed to write EU results JSON: {e}")
+            logger.warning(f"Error processing {country}: {e}")
+            return None
+
+    def load_country_daily_sales(self, country, file_path):
+        """Daily sales totals for one country, or None when its report cannot be read."""
+        if self.daily_by_country.get(country) is not None:
+            return self.daily_by_country[country].set_index('date')['sales']
+        try:
+            daily = load_daily_sales(file_path, self.master_stores[country])
+        except Exception as e:
+            logger.error(f"{country} daily sales could not be read: {e}")
+            return None
+        return daily.set_index('date')['sales']
+
+    def multi_country_backfill(self, start_date, end_date):
+        """Recompute EU estimates for every report date in a range and save them in one write."""
+        results = {}
+        country_estimates = self.run_per_country(self.backfill_country, start_date, end_date)
+        for country, estimates in country_estimates.items():
+            for key, values in (estimates or {}).items():
+                results.setdefault(key, []).append({"market": f"Enzymedica EU - {country}", **values})
+
+        self.save_results(results)
+        self.results_store.compact()
+        return results
+
+    def backfill_country(self, country, file_path, start_date, end_date):
+        """Backfill estimates for one country, or None when its report cannot be read."""
+        try:
+            daily_sales = self.load_country_daily_sales(country, file_path)
+            if daily_sales is None:
+                return None
+            return backfill_estimates(daily_sales, start_date, end_date)
+        except Exception as e:
+            logger.warning(f"Error processing {country}: {e}")
+            return None
+
+    def save_results(self, results):
+        """Save each {report_date_key: [results]} to the results store, replacing those countries' entries."""
+        try:
+            rows = self.results_store.save(results)
+            logger.info(f"Saved {rows} EU sales estimation results.")
+        except Exception as e:
+            logger.error(f"Failed to save EU sales estimation results: {e}")
+
 
 if __name__ == "__main__":
-    logger.info("Starting EU Sales Estimation Report...")
-    estimator = SalesEstimation()
-    estimator.multi_country_sales_estimation(selected_date=datetime.today().day)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Enzymedica EU sales estimation.")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"),
+                        help="Recompute estimates for every report date from START to END (YYYY-MM-DD).")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Number of countries to estimate concurrently (1 runs them sequentially).")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="Run countries in a thread pool or a process pool.")
+    args = parser.parse_args()
+    estimator = SalesEstimation(max_workers=args.workers, executor=args.executor)
+
+    if args.backfill:
+        logger.info(f"EU Sales Estimation backfill started for {args.backfill[0]} to {args.backfill[1]}.")
+        estimator.multi_country_backfill(*args.backfill)
+    else:
+        logger.info("Starting EU Sales Estimation Report...")
+        estimator.multi_country_sales_estimation(selected_date=datetime.today().day)
\ No newline at end of file
@@ -0,0 +1,98 @@
+import os
+import sys
+import argparse
+import warnings
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.master_store import MasterStore
+from common.daily_aggregates import load_daily_sales
+from common.panel_estimation import stack_daily_panel, panel_month_end_estimates
+from common.results_store import ResultsStore
+from common.script_logging import configure_script_logging
+
+warnings.simplefilter(action='ignore', category=FutureWarning)
+warnings.simplefilter(action='ignore', category=UserWarning)
+
+# LOGGING CONFIGURATION
+logger = configure_script_logging(__name__, r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\sales_estimation_report.log', sys.stdout)
+
+REPORT_FILES = r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\ReportFiles"
+MASTER_FILES = r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\MasterFiles"
+
+# Market name in sales_results.json -> (cleaned sales report, transaction master it is built from).
+MARKETS = {
+    "Enzymedica US": ("US-EnzymedicaSalesReport.csv", "EnzymedicaCustomTransaction.csv"),
+    "Enzyme Science US": ("EnzymeScienceSalesReport.csv", "EnzymeScienceCustomTransaction.csv"),
+    "Enzymedica EU - Germany": ("GermanySalesReport.csv", "GermanyCustomTransaction.csv"),
+    "Enzymedica EU - Italy": ("ItalySalesReport.csv", "ItalyCustomTransaction.csv"),
+    "Enzymedica EU - France": ("FranceSalesReport.csv", "FranceCustomTransaction.csv"),
+    "Enzymedica EU - Spain": ("SpainSalesReport.csv", "SpainCustomTransaction.csv"),
+}
+
+
+class SalesEstimation:
+    """Month-end estimates for every market at once from a stacked (market, date) panel of daily totals."""
+
+    def __init__(self, markets=None):
+        self.markets = {
+            market: (os.path.join(REPORT_FILES, report), MasterStore(os.path.join(MASTER_FILES, master)))
+            for market, (report, master) in (markets or MARKETS).items()
+        }
+        self.results_store = ResultsStore()
+        # Daily aggregates already in memory, e.g. handed over by the pipeline runner.
+        self.daily_by_market = {}
+
+    def load_market_daily_sales(self, market):
+        """Daily sales totals for one market, or None when its report cannot be read."""
+        if self.daily_by_market.get(market) is not None:
+            return self.daily_by_market[market].set_index('date')['sales']
+        output_path, master_store = self.markets[market]
+        try:
+            daily = load_daily_sales(output_path, master_store)
+        except Exception as e:
+            logger.error(f"{market} daily sales could not be read: {e}")
+            return None
+        return daily.set_index('date')['sales']
+
+    def panel_sales_estimation(self, selected_date):
+        """Estimate every market and save all rows of the report date in one write."""
+        today = datetime.today()
+        cutoff_date = datetime(today.year, today.month, selected_date)
+        report_date = cutoff_date - timedelta(days=1)
+
+        daily_by_market = {market: self.load_market_daily_sales(market) for market in self.markets}
+        daily_by_market = {market: daily for market, daily in daily_by_market.items() if daily is not None}
+        if not daily_by_market:
+            logger.error("No market has daily sales to estimate.")
+            return []
+
+        estimates = panel_month_end_estimates(stack_daily_panel(daily_by_market), cutoff_date)
+        results = [
+            {"market": market, **{key: float(value) for key, value in row.items()}}
+            for market, row in estimates.iterrows()
+        ]
+        for result in results:
+            logger.info(f"{result['market']}: actual {result['actual_sales']:,.2f}, estimated {result['estimated_sales']:,.2f}, total {result['total_estimation']:,.2f}")
+
+        self.save_results({report_date.strftime("%Y-%m-%d"): results})
+        return results
+
+    def save_results(self, results):
+        """Save each {report_date_key: [results]} to the results store, replacing those markets' entries."""
+        try:
+            rows = self.results_store.save(results)
+            logger.info(f"Saved {rows} panel sales estimation results.")
+        except Exception as e:
+            logger.error(f"Failed to save panel sales estimation results: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sales estimation for every market from one stacked daily panel.")
+    parser.add_argument("--market", action="append", choices=list(MARKETS),
+                        help="Estimate only this market. Can be given more than once; defaults to all markets.")
+    args = parser.parse_args()
+
+    logger.info("Panel Sales Estimation started.")
+    markets = {market: MARKETS[market] for market in args.market} if args.market else None
+    SalesEstimation(markets).panel_sales_estimation(selected_date=datetime.today().day)
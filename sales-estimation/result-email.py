@@ -1,35 +1,28 @@
 import os
-import json
+import sys
 import smtplib
-import logging
 from datetime import datetime, date, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.results_store import ResultsStore
+from common.script_logging import configure_script_logging
+
 # Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(r"C:\Users\d.tanubudhi\amazon_sales_estimation\logs\email_sales_estimation.log", encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
-
-def send_sales_summary_email():
+logger = configure_script_logging(__name__, r"C:\Users\d.tanubudhi\amazon_sales_estimation\logs\email_sales_estimation.log")
+
+def send_sales_summary_email(sales_data=None):
+    """Email the summary for yesterday, reading the results store unless sales_data is given."""
     try:
         report_date = date.today() - timedelta(days=1)
         report_date_key = report_date.strftime("%Y-%m-%d")
-        json_path = r"C:\Users\d.tanubudhi\amazon_sales_estimation\sales-estimation\sales_results.json"
-
-        if not os.path.exists(json_path):
-            raise FileNotFoundError(f"No JSON file found at {json_path}")
 
-        with open(json_path, 'r') as f:
-            sales_data = json.load(f)
+        if sales_data is None:
+            sales_data = ResultsStore().load()
 
         if report_date_key not in sales_data:
-            raise ValueError(f"No sales data found for {report_date_key} in JSON.")
+            raise ValueError(f"No sales data found for {report_date_key} in the results store.")
 
         eu_actual, eu_estimated, eu_total = 0.0, 0.0, 0.0
         grand_actual, grand_estimated, grand_total = 0.0, 0.0, 0.0
@@ -165,10 +158,10 @@ def send_sales_summary_email():
         server.send_message(msg)
         server.quit()
 
-        logging.info("Sales estimation summary email sent successfully.")
+        logger.info("Sales estimation summary email sent successfully.")
 
     except Exception as e:
-        logging.error(f"Failed to send email: {e}")
+        logger.error(f"Failed to send email: {e}")
 
 if __name__ == "__main__":
     send_sales_summary_email()
@@ -1,28 +1,27 @@
 import re
 import os
 import sys
-import json
-import logging
 import pandas as pd
 from datetime import datetime
 import warnings
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.timestamps import parse_report_timestamps, US_REPORT_DATE_FORMAT, US_REPORT_TIMEZONE
+from common.material_master import MaterialMaster
+from common.report_storage import encode_categoricals
+from common.script_logging import configure_script_logging
+
 warnings.simplefilter(action='ignore', category=FutureWarning)
 warnings.simplefilter(action='ignore', category=UserWarning)
 
 # LOGGING CONFIGURATION
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\data_processing.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)]
-    )
-logger = logging.getLogger(__name__)
+logger = configure_script_logging(__name__, r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\data_processing.log', sys.stdout)
 
 class DataProcessing:
     def __init__(self):
         self.report_folder = r'C:\Users\d.tanubudhi\amazon_sales_estimation\reports\enzymedica-sales-reports'
         self.json_path = r'C:\Users\d.tanubudhi\amazon_sales_estimation\sales-estimation\sku-asin.json'
+        self.material_master = MaterialMaster(r"C:\Users\d.tanubudhi\amazon_sales_estimation\reports\Enzymedica - Material Master 03172025.xlsx")
 
     def get_the_latest_report(self):
         """Getting the latest report file from reports folder using regex."""
@@ -50,19 +49,6 @@ class DataProcessing:
         logger.info(f"Latest report found: {latest_file_path} with extracted date {extracted_date}")
         return latest_file_path, extracted_date
     
-    def read_material_master(self):
-        """Material Master file to merge the reports."""
-        try:
-            logger.info("Reading Material Master file.")
-            material_master_path = r"C:\Users\d.tanubudhi\amazon_sales_estimation\reports\Enzymedica - Material Master 03172025.xlsx"
-            dff = pd.read_excel(material_master_path, sheet_name='All ASINs with Priority')
-            dff = dff[['seller-sku', 'ASIN']].rename(columns={'seller-sku': 'sku'})
-            logger.info("Completed loading Material Master file.")
-            return dff
-        except Exception as e:
-            logger.warning(f"Couldn't read Material Master file. {e}")
-            return pd.DataFrame()
-
     def read_csv(self):
         """Reads and processes the latest report file."""
         latest_file, extracted_date = self.get_the_latest_report()
@@ -73,7 +59,7 @@ class DataProcessing:
         logger.info(f"Reading file: {latest_file}")
         df = pd.read_csv(latest_file, skiprows=7)
         df.columns = df.columns.str.replace(' ', '_').str.replace('/', '_')
-        df["date_time"] = pd.to_datetime(df["date_time"].str.replace(" PST", "", regex=False))
+        df["date_time"] = parse_report_timestamps(df["date_time"], US_REPORT_DATE_FORMAT, tz=US_REPORT_TIMEZONE)
         df["date"] = df["date_time"].dt.date
         df["time"] = df["date_time"].dt.time
         df["weekday"] = df["date_time"].dt.day_name()
@@ -100,13 +86,9 @@ class DataProcessing:
             'promotional_rebates_tax', 'marketplace_withheld_tax', 'data_time']
         df.drop(columns=[col for col in columns_to_remove if col in df.columns], inplace=True)
 
-        material_master = self.read_material_master()
-        sku_asin_map = material_master.drop_duplicates(subset='sku').set_index('sku')['ASIN'].to_dict()
-
-        with open(self.json_path, 'w') as f:
-            json.dump(sku_asin_map, f, indent=1)
-
-        df['ASIN'] = df['sku'].map(sku_asin_map)
+        self.material_master.write_json(self.json_path)
+        df['ASIN'] = self.material_master.map_asins(df['sku'])
+        encode_categoricals(df)
 
         rearrange_columns = [
             'date', 'time', 'weekday', 'settlement_id','type','order_id','sku', 'ASIN', 'description','quantity','marketplace',
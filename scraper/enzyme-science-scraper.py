@@ -1,11 +1,7 @@
 import os
-import re
 import sys
-import time
 import json
 import pyotp
-import random
-import logging
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from selenium import webdriver
@@ -14,16 +10,19 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
+from requests import RequestException
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.retry import run_with_retries
+from common.browser_pool import browser_pool, account_switcher_url, is_signed_in, NA
+from common.pacing import pacing
+from common.report_poller import poll_until, wait_for_download, record_wait_time
+from common.http_download import report_url, download_report
+from common.script_logging import configure_script_logging
 
 # LOGGING CONFIGURATION
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\enzyme-science-reports.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)]
-    )
-logger = logging.getLogger(__name__)
+logger = configure_script_logging(__name__, r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\enzyme-science-reports.log', sys.stdout)
 
 # LOAD ENVIRONMENT VARIABLES
 load_dotenv()
@@ -31,19 +30,27 @@ load_dotenv()
 # CONFIGURATION
 CONFIG = {
     "enzyme_science_download_path": r'C:\Users\d.tanubudhi\amazon_sales_estimation\reports\enzyme-science-reports',
-    "cookies_path": r"C:\Users\d.tanubudhi\amazon_sales_estimation\cookies.json",
+    "cookies_path": r"C:\Users\d.tanubudhi\amazon_sales_estimation\cookies-na.json",
     "login_url": os.getenv("LOGIN_URL"),
     "credentials": {
         "email": os.getenv("AMAZON_SELLER_EMAIL"),
         "password": os.getenv("AMAZON_SELLER_PASSWORD"),
         "totp_secret": os.getenv("TOTP_SECRET")  
     },
+    "report_timeout": 900,
 }
 
+REPORT_FILE_PATTERN = r"\d{4}[A-Za-z]{3}\d{1,2}-\d{4}[A-Za-z]{3}\d{1,2}CustomTransaction\.csv"
+DOWNLOAD_BUTTON_XPATH = '//*[@id="root"]/article[3]/section/div/kat-card/div/div/div/div[1]/kat-table/kat-table-body/kat-table-row[1]/kat-table-cell[8]/div/kat-button'
+MARKETPLACE = "Enzyme Science US"
+
 class BusinessReportDownloads:
     def __init__(self):
         """Initializing the Web Scraper."""
-        self.driver = self.setup_driver()
+        self.session = None
+        self.driver = None
+        self.report_url = None
+        self.download_dir = CONFIG["enzyme_science_download_path"]
 
     def setup_driver(self):
         """Setup Selenium WebDriver with optimized options."""
@@ -54,28 +61,50 @@ class BusinessReportDownloads:
         options.add_argument("--headless")
 
         return webdriver.Chrome(options=options)
-    
-    def random_delay(self, min_seconds=2, max_seconds=5):
-        """Add a Random Delay Between Actions to Avoid Detection."""
-        delay = random.uniform(min_seconds, max_seconds)
-        logger.info(f"Delaying for {delay:.2f} seconds...")
-        time.sleep(delay)
+
+    def attach(self, session):
+        """Drive a pooled browser session, saving downloads to this marketplace's folder."""
+        self.session = session
+        self.driver = session.driver
+        session.set_download_dir(self.download_dir)
     
     def load_cookies(self):
         """Load Cookies from File."""
-        if os.path.exists(CONFIG["cookies_path"]):
+        if not os.path.exists(CONFIG["cookies_path"]):
+            return False
+        try:
             self.driver.get(CONFIG["login_url"])
             with open(CONFIG["cookies_path"], "r") as f:
                 cookies = json.load(f)
             for cookie in cookies:
                 self.driver.add_cookie(cookie)
-            logger.info("Cookies loaded successfully -> Skipping login!")
+        except (ValueError, WebDriverException) as e:
+            logger.warning(f"Could not load saved cookies: {e}")
+            return False
+        logger.info("Cookies loaded successfully.")
+
+        self.driver.refresh()
+        pacing.page_ready(self.driver)
+        return True
+
+    def restore_session(self):
+        """Reuse the saved cookies if they still hold a live session."""
+        if not self.load_cookies():
+            return False
+        if not is_signed_in(self.driver):
+            logger.info("Saved session has expired, logging in again.")
+            return False
+        logger.info("Saved session is still valid -> Skipping login!")
+        self.session.authenticated = True
+        return True
+
+    def sign_in(self):
+        """Log in only when neither this browser session nor the saved cookies are still signed in."""
+        if self.session.authenticated:
+            logger.info("Already logged in, skipping login.")
+        elif not self.restore_session():
+            self.login()
 
-            self.random_delay(2, 4)
-            self.driver.refresh()
-            return True
-        return False
-    
     def save_cookies(self):
         """Save Cookies After Login."""
         with open(CONFIG["cookies_path"], 'w') as f: 
@@ -107,7 +136,7 @@ class BusinessReportDownloads:
                 EC.presence_of_element_located((By.XPATH, '//*[@id="ap_password"]'))
             ).send_keys(CONFIG["credentials"]["password"], Keys.RETURN)
 
-            self.random_delay(2, 4)
+            pacing.pause(2, 4)
 
             # Handle OTP/MFA manually
             try:
@@ -117,7 +146,7 @@ class BusinessReportDownloads:
                 otp_code = self.generate_otp()  # Generate OTP dynamically
                 if otp_code:
                     otp_input.send_keys(otp_code, Keys.RETURN)
-                    self.random_delay(5, 10)
+                    pacing.page_ready(self.driver, timeout=30)
                 else:
                     logger.error("Failed to generate OTP")
                     return
@@ -126,6 +155,7 @@ class BusinessReportDownloads:
 
             self.save_cookies()
             logger.info("Login was successful!")
+            self.session.authenticated = True
 
         except Exception as e:
             logger.warning(f"Login failed: {e}")
@@ -133,8 +163,11 @@ class BusinessReportDownloads:
     def navigate_to_reports(self):
         """Navigate to Reports Repository."""
         logger.info("Navigating to Reports Page...")
-        self.driver.get(CONFIG['login_url'])
-        self.random_delay(2, 4)
+        # A reused session is still on the previous marketplace, so open the
+        # account switcher explicitly instead of relying on the post-login prompt.
+        switching = self.session.marketplace not in (None, MARKETPLACE)
+        self.driver.get(account_switcher_url(CONFIG['login_url']) if switching else CONFIG['login_url'])
+        pacing.page_ready(self.driver)
 
         try:
             account_select = WebDriverWait(self.driver, 10).until(
@@ -163,6 +196,11 @@ class BusinessReportDownloads:
         except:
             logger.info("'United States' button not found")
 
+        if switching:
+            self.driver.get(CONFIG['login_url'])
+            pacing.page_ready(self.driver)
+        self.session.marketplace = MARKETPLACE
+
         try:
             logger.info("Clicking on 'Skip button'")
             skip_button = WebDriverWait(self.driver, 5).until(EC.element_to_be_clickable(
@@ -215,85 +253,92 @@ class BusinessReportDownloads:
             EC.element_to_be_clickable((By.ID, "filter-generate-button"))
         )
         request_button.click()
-        self.random_delay(3, 5)
+        pacing.page_ready(self.driver)
         logger.info("Report request submitted.")
 
-    def wait_for_report(self):
-        """Wait for Report to be Ready and Download It."""
-        logger.info("Waiting for report to be ready...")
-
-        while True:
-            try:
-                # Click Refresh Button Every 2 Seconds
-                refresh_button = WebDriverWait(self.driver, 2).until(
-                    EC.element_to_be_clickable((By.XPATH, "//kat-button[contains(@label, 'Refresh')]"))
-                )
-                refresh_button.click()
-                logger.info("Clicked 'Refresh' button...")
-                time.sleep(2)
-                
-                # Check if Download Button Exists
-                download_button = WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.XPATH, '//*[@id="root"]/article[3]/section/div/kat-card/div/div/div/div[1]/kat-table/kat-table-body/kat-table-row[1]/kat-table-cell[8]/div/kat-button'))
-                )
-                logger.info("Download button found.")
-                if download_button:
+    def click_download_if_ready(self):
+        """Click 'Download CSV' on the newest report if it is ready, otherwise refresh the table."""
+        try:
+            download_buttons = self.driver.find_elements(By.XPATH, DOWNLOAD_BUTTON_XPATH)
+            if download_buttons:
+                self.report_url = report_url(self.driver, download_buttons[0])
+                if self.report_url:
+                    logger.info("Report is ready! Fetching it over HTTP...")
+                else:
                     logger.info("Report is ready! Clicking 'Download CSV' button...")
-                    download_button.click()
-                    self.random_delay(2, 4)
-                    logger.info("Report downloaded successfully!")
-                    return
-
-            except:
-                logger.warning("Report not ready, retrying in 2 seconds...")
-
-    def check_new_file_downloaded(self, before_files):
-        """Check if a new report file matching expected pattern has been downloaded."""
-        pattern = re.compile(r"\d{4}[A-Za-z]{3}\d{1,2}-\d{4}[A-Za-z]{3}\d{1,2}CustomTransaction\.csv")
-        after_files = set(os.listdir(CONFIG["enzyme_science_download_path"]))
-        new_files = after_files - before_files
-
-        for file in new_files:
-            if pattern.match(file):
-                logger.info(f"New file detected: {file}")
+                    download_buttons[0].click()
                 return True
-        logger.warning("No new matching file downloaded.")
+            WebDriverWait(self.driver, 5).until(
+                EC.element_to_be_clickable((By.XPATH, "//kat-button[contains(@label, 'Refresh')]"))
+            ).click()
+            logger.info("Clicked 'Refresh' button...")
+        except WebDriverException as e:
+            logger.warning(f"Report not ready yet: {e.__class__.__name__}")
         return False
-    
-if __name__ == "__main__":
-    success = False
-    attempts = 0
-    max_attempts = 5
 
-    while not success and attempts < max_attempts:
-        getreports = BusinessReportDownloads()
-        attempts += 1
-        logger.info(f"Attempt #{attempts} to download the report...")
-
-        try:
-            getreports.login()
-            getreports.navigate_to_reports()
+    def wait_for_report(self, before_files):
+        """Wait for the requested report, download it and return the downloaded file name.
 
-            today = datetime.today()
-            date = today - timedelta(days=1)
-            formatted_start_date = date.strftime("%m/%d/%Y")
-            formatted_end_date = date.strftime("%m/%d/%Y")
+        Polls the report table with backoff until the download button shows up,
+        then watches the download folder for the finished file. Raises
+        ReportWaitTimeout if either step runs past its deadline.
+        """
+        logger.info("Waiting for report to be ready...")
+        _, generation_seconds = poll_until(
+            self.click_download_if_ready, timeout=CONFIG["report_timeout"], description="the report to be generated"
+        )
+        return self.collect_download(before_files, generation_seconds)
 
-            before_files = set(os.listdir(CONFIG["enzyme_science_download_path"]))
+    def collect_download(self, before_files, generation_seconds):
+        """Fetch the ready report and record how long it took.
 
-            getreports.set_date_range(formatted_start_date, formatted_end_date)
-            getreports.request_report()
-            getreports.wait_for_report()
+        Streams it over HTTP with the browser's cookies when the table exposes
+        a URL, otherwise (or if that fails) lets Chrome download it and
+        watches the download folder.
+        """
+        file_name = None
+        if self.report_url:
+            try:
+                file_name, download_seconds = download_report(self.session.http_session(), self.report_url, self.download_dir)
+            except (RequestException, IOError) as e:
+                logger.warning(f"HTTP download failed, falling back to the browser: {e}")
+                self.driver.find_element(By.XPATH, DOWNLOAD_BUTTON_XPATH).click()
+        if file_name is None:
+            file_name, download_seconds = wait_for_download(self.download_dir, before_files, REPORT_FILE_PATTERN)
+        self.report_wait_seconds = generation_seconds + download_seconds
+        record_wait_time(MARKETPLACE, generation_seconds, download_seconds)
+        logger.info(f"Report downloaded successfully: {file_name}")
+        return file_name
+
+def run_download():
+    """Download yesterday's Enzyme Science US transaction report.
+
+    Makes a single attempt and raises when the report is not downloaded in time, so
+    callers decide how often to retry.
+    """
+    getreports = BusinessReportDownloads()
+    with browser_pool.session(NA, getreports.setup_driver) as session:
+        getreports.attach(session)
+        getreports.sign_in()
+        getreports.navigate_to_reports()
+
+        today = datetime.today()
+        date = today - timedelta(days=1)
+        formatted_start_date = date.strftime("%m/%d/%Y")
+        formatted_end_date = date.strftime("%m/%d/%Y")
+
+        before_files = set(os.listdir(CONFIG["enzyme_science_download_path"]))
+
+        getreports.set_date_range(formatted_start_date, formatted_end_date)
+        getreports.request_report()
+        getreports.wait_for_report(before_files)
+        return True
 
-            success = getreports.check_new_file_downloaded(before_files)
 
-        except Exception as e:
-            logger.warning(f"Attempt failed due to: {e}")
-        finally:
-            getreports.driver.quit()
-
-    if success:
+if __name__ == "__main__":
+    try:
+        run_with_retries(run_download, max_attempts=5, delay=0, description="the Enzyme Science US report download")
         logger.info("Report downloaded successfully.")
-    else:
+    except Exception:
         logger.error("Failed to download new report after multiple attempts.")
-
+    pacing.log_summary()
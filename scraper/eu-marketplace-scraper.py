@@ -0,0 +1,500 @@
+import os
+import sys
+import re
+import json
+import pyotp
+import argparse
+from dotenv import load_dotenv
+from datetime import datetime, timedelta
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
+from requests import RequestException
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.master_store import MasterStore
+from common.retry import run_with_retries
+from common.browser_pool import browser_pool, account_switcher_url, is_signed_in, EU
+from common.pacing import pacing
+from common.report_poller import poll_until, wait_for_download, record_wait_time
+from common.http_download import report_url, download_report
+from common.report_storage import write_sales_report, encode_categoricals
+from common.daily_aggregates import DailyAggregateStore
+from common.marketplaces import MARKETPLACES
+from common.locale_numbers import parse_localized_numbers
+from common.timestamps import parse_report_timestamps
+from common.chunked_cleaning import CHUNK_ROWS, clean_master_in_chunks
+from common.script_logging import configure_script_logging
+
+# LOGGING CONFIGURATION
+logger = configure_script_logging(__name__, r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\eu-enzymedica-reports.log', sys.stdout)
+
+# LOAD ENVIRONMENT VARIABLES
+load_dotenv()
+
+# CONFIGURATION
+CONFIG = {
+    "europe_download_path": r'C:\Users\d.tanubudhi\amazon_sales_estimation\reports\europe-sales-reports',
+    "master_files_path": r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\MasterFiles",
+    "report_files_path": r"C:\Users\d.tanubudhi\OneDrive - Enzymedica\Documents\Sales_Estimations_Reports\ReportFiles",
+    "cookies_path": r"C:\Users\d.tanubudhi\amazon_sales_estimation\cookies-eu.json",
+    "login_url": 'https://sellercentral.amazon.de/payments/reports-repository/ref=xx_rrepo_dnav_xx',
+    "credentials": {
+        "email": os.getenv("EU_AMAZON_SELLER_EMAIL"),
+        "password": os.getenv("EU_SELLER_PASSWORD"),
+        "totp_secret": os.getenv("EU_TOTP_SECRET")  
+    },
+    "report_timeout": 900,
+}
+
+REPORT_FILE_PATTERN = r"\d{4}[A-Za-z]{3}\d{1,2}-\d{4}[A-Za-z]{3}\d{1,2}CustomTransaction\.csv"
+DOWNLOAD_BUTTON_XPATH = '//*[@id="root"]/article[3]/section/div/kat-card/div/div/div/div[1]/kat-table/kat-table-body/kat-table-row[1]/kat-table-cell[8]/div/kat-button'
+NUMERICAL_COLUMNS = [
+    'quantity', 'product_sales', 'product_sales_tax', 'shipping_credits',
+    'shipping_credits_tax', 'gift_wrap_credits', 'giftwrap_credits_tax',
+    'promotional_rebates', 'promotional_rebates_tax', 'marketplace_withheld_tax',
+    'selling_fees', 'fba_fees', 'other_transaction_fees', 'other', 'total'
+]
+
+OUTPUT_COLUMNS = [
+    'date', 'time', 'weekday', 'settlement_id', 'type', 'order_id', 'sku',
+    'description', 'quantity', 'marketplace', 'fulfillment', 'order_city',
+    'order_state', 'order_postal', 'tax_collection_model', 'product_sales',
+    'product_sales_tax', 'shipping_credits', 'shipping_credits_tax',
+    'gift_wrap_credits', 'giftwrap_credits_tax', 'promotional_rebates',
+    'promotional_rebates_tax', 'marketplace_withheld_tax', 'selling_fees',
+    'fba_fees', 'other_transaction_fees', 'other', 'total'
+]
+
+
+class MarketplaceReportDownloads:
+    """Downloads and cleans one EU marketplace's transaction report.
+
+    Everything market-specific (account button, folders, localized headers,
+    dates and numbers) comes from the market's entry in common.marketplaces.
+    """
+
+    def __init__(self, market):
+        """Initializing the Web Scraper."""
+        if market not in MARKETPLACES:
+            raise ValueError(f"Unknown marketplace '{market}', expected one of {', '.join(MARKETPLACES)}")
+        self.market = market
+        self.settings = MARKETPLACES[market]
+        self.session = None
+        self.driver = None
+        self.report_url = None
+        self.download_dir = os.path.join(CONFIG["europe_download_path"], self.settings["folder"])
+        self.master_file = os.path.join(CONFIG["master_files_path"], f"{market}CustomTransaction.csv")
+        self.report_folder = self.download_dir
+        self.output_file = os.path.join(CONFIG["report_files_path"], f"{market}SalesReport.csv")
+        self.master_store = MasterStore(self.master_file)
+        self.daily_store = DailyAggregateStore.for_report(self.output_file)
+
+    def setup_driver(self):
+        """Setup Selenium WebDriver with optimized options."""
+        options = Options()
+        options.add_argument("--start-maximized")
+        options.add_experimental_option("prefs", {"download.default_directory": self.download_dir})
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--headless")
+        options.add_argument("--log-level=3")
+
+        return webdriver.Chrome(options=options)
+
+    def attach(self, session):
+        """Drive a pooled browser session, saving downloads to this marketplace's folder."""
+        self.session = session
+        self.driver = session.driver
+        session.set_download_dir(self.download_dir)
+    
+    def load_cookies(self):
+        """Load Cookies from File."""
+        if not os.path.exists(CONFIG["cookies_path"]):
+            return False
+        try:
+            self.driver.get(CONFIG["login_url"])
+            with open(CONFIG["cookies_path"], "r") as f:
+                cookies = json.load(f)
+            for cookie in cookies:
+                self.driver.add_cookie(cookie)
+        except (ValueError, WebDriverException) as e:
+            logger.warning(f"Could not load saved cookies: {e}")
+            return False
+        logger.info("Cookies loaded successfully.")
+
+        self.driver.refresh()
+        pacing.page_ready(self.driver)
+        return True
+
+    def restore_session(self):
+        """Reuse the saved cookies if they still hold a live session."""
+        if not self.load_cookies():
+            return False
+        if not is_signed_in(self.driver):
+            logger.info("Saved session has expired, logging in again.")
+            return False
+        logger.info("Saved session is still valid -> Skipping login!")
+        self.session.authenticated = True
+        return True
+
+    def sign_in(self):
+        """Log in only when neither this browser session nor the saved cookies are still signed in."""
+        if self.session.authenticated:
+            logger.info("Already logged in, skipping login.")
+        elif not self.restore_session():
+            self.login()
+
+    def save_cookies(self):
+        """Save Cookies After Login."""
+        with open(CONFIG["cookies_path"], 'w') as f: 
+            json.dump(self.driver.get_cookies(), f, indent=2)
+        logger.info("Cookies saved successfully!")
+
+    def generate_otp(self):
+        """Generate OTP using PyOTP"""
+        totp_secret = CONFIG["credentials"]["totp_secret"]
+        if not totp_secret:
+            logger.error("TOTP Secret not found in environment variables.")
+            return None
+
+        totp = pyotp.TOTP(totp_secret)
+        otp_code = totp.now()
+        logger.info(f"Generated OTP: {otp_code}")
+        return otp_code
+
+    def login(self):
+        """Handle Login and MFA (if required)."""
+        self.driver.get(CONFIG["login_url"])
+        try:
+            logger.info("Logging in...")
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.XPATH, '//*[@id="ap_email"]'))
+            ).send_keys(CONFIG["credentials"]["email"], Keys.RETURN)
+            
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.XPATH, '//*[@id="ap_password"]'))
+            ).send_keys(CONFIG["credentials"]["password"], Keys.RETURN)
+
+            pacing.pause(2, 4)
+
+            # Handle OTP/MFA manually
+            try:
+                otp_input = WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.NAME, "otpCode"))
+                )
+                otp_code = self.generate_otp()  # Generate OTP dynamically
+                if otp_code:
+                    otp_input.send_keys(otp_code, Keys.RETURN)
+                    pacing.page_ready(self.driver, timeout=30)
+                else:
+                    logger.error("Failed to generate OTP")
+                    return
+            except:
+                logger.info("No OTP required")
+
+            self.save_cookies()
+            logger.info("Login was successful!")
+            self.session.authenticated = True
+
+        except Exception as e:
+            logger.warning(f"Login failed: {e}")
+
+    def navigate_to_reports(self):
+        """Navigate to Reports Repository."""
+        logger.info("Navigating to Reports Page...")
+        # A reused session is still on the previous marketplace, so open the
+        # account switcher explicitly instead of relying on the post-login prompt.
+        switching = self.session.marketplace not in (None, self.market)
+        self.driver.get(account_switcher_url(CONFIG['login_url']) if switching else CONFIG['login_url'])
+        pacing.page_ready(self.driver)
+
+        try:
+            market_button = WebDriverWait(self.driver, 10).until(
+                EC.element_to_be_clickable((By.XPATH, self.settings["account_button"]))
+            )
+            if self.settings["pause_before_click"]:
+                pacing.pause(*self.settings["pause_before_click"])
+            market_button.click()
+            logger.info(f"Clicked on {self.market} button")
+
+            select_button = WebDriverWait(self.driver, 10).until(
+                EC.element_to_be_clickable(
+                    (By.XPATH, '//button[contains(@class, "full-page-account-switcher-buttons")]')
+                )
+            )
+            select_button.click()
+            logger.info(f"Clicked on 'Select Account - {self.market}' button")
+
+        except:
+            logger.info(f"'{self.market}' button not found")
+
+        if switching:
+            self.driver.get(CONFIG['login_url'])
+            pacing.page_ready(self.driver)
+        self.session.marketplace = self.market
+
+        try:
+            logger.info("Clicking on 'Skip button'")
+            skip_button = WebDriverWait(self.driver, 5).until(EC.element_to_be_clickable(
+                (By.XPATH, '//*[@id="react-joyride-step-0"]/div/div/div/div[2]/div/button')))
+            skip_button.click()
+            logger.info("Successfully clicked 'Skip button'.")
+        except:
+            logger.warning("'Skip button' not found")
+
+    def expand_shadow_element(self, selector):
+        """Expands Shadow DOM and Returns the Input Element Inside."""
+        try:
+            WebDriverWait(self.driver, 15).until(
+                lambda d: d.execute_script("return document.querySelector(arguments[0]) !== null", selector)
+            )
+            shadow_host = self.driver.find_element(By.CSS_SELECTOR, selector)
+            shadow_root = self.driver.execute_script("return arguments[0].shadowRoot", shadow_host)
+            return shadow_root.find_element(By.CSS_SELECTOR, "input")
+        except:
+            logger.warning(f"Failed to expand shadow element '{selector}': {e}")
+            return None
+            
+
+    def set_date_range(self, start_date, end_date):
+        """Set Date Range in the Shadow DOM Date Picker."""
+        logger.info(f"Setting date range: {start_date} -> {end_date}")
+
+        try:
+            # Expand Shadow DOM elements
+            start_date_input = self.expand_shadow_element("kat-date-picker[name='startDate']")
+            end_date_input = self.expand_shadow_element("kat-date-picker[name='endDate']")
+
+            # Function to set date
+            def set_date(input_element, date_value):
+                self.driver.execute_script("arguments[0].value = arguments[1];", input_element, date_value)
+                self.driver.execute_script("arguments[0].dispatchEvent(new Event('input', { bubbles: true }));", input_element)
+                self.driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }));", input_element)
+
+            set_date(start_date_input, start_date)
+            set_date(end_date_input, end_date)
+            logger.info("Date range set successfully!")
+
+        except Exception as e:
+            logger.warning(f"Error setting date: {e}")
+
+    def request_report(self):
+        """Click 'Request Report' Button."""
+        logger.info("Requesting report...")
+        request_button = WebDriverWait(self.driver, 10).until(
+            EC.element_to_be_clickable((By.ID, "filter-generate-button"))
+        )
+        request_button.click()
+        pacing.page_ready(self.driver)
+        logger.info("Report request submitted.")
+
+    def click_download_if_ready(self):
+        """Click 'Download CSV' on the newest report if it is ready, otherwise refresh the table."""
+        try:
+            download_buttons = self.driver.find_elements(By.XPATH, DOWNLOAD_BUTTON_XPATH)
+            if download_buttons:
+                self.report_url = report_url(self.driver, download_buttons[0])
+                if self.report_url:
+                    logger.info("Report is ready! Fetching it over HTTP...")
+                else:
+                    logger.info("Report is ready! Clicking 'Download CSV' button...")
+                    download_buttons[0].click()
+                return True
+            WebDriverWait(self.driver, 5).until(
+                EC.element_to_be_clickable((By.XPATH, "//kat-button[contains(@label, 'Refresh')]"))
+            ).click()
+            logger.info("Clicked 'Refresh' button...")
+        except WebDriverException as e:
+            logger.warning(f"Report not ready yet: {e.__class__.__name__}")
+        return False
+
+    def wait_for_report(self, before_files):
+        """Wait for the requested report, download it and return the downloaded file name.
+
+        Polls the report table with backoff until the download button shows up,
+        then watches the download folder for the finished file. Raises
+        ReportWaitTimeout if either step runs past its deadline.
+        """
+        logger.info("Waiting for report to be ready...")
+        _, generation_seconds = poll_until(
+            self.click_download_if_ready, timeout=CONFIG["report_timeout"], description="the report to be generated"
+        )
+        return self.collect_download(before_files, generation_seconds)
+
+    def collect_download(self, before_files, generation_seconds):
+        """Fetch the ready report and record how long it took.
+
+        Streams it over HTTP with the browser's cookies when the table exposes
+        a URL, otherwise (or if that fails) lets Chrome download it and
+        watches the download folder.
+        """
+        file_name = None
+        if self.report_url:
+            try:
+                file_name, download_seconds = download_report(self.session.http_session(), self.report_url, self.download_dir)
+            except (RequestException, IOError) as e:
+                logger.warning(f"HTTP download failed, falling back to the browser: {e}")
+                self.driver.find_element(By.XPATH, DOWNLOAD_BUTTON_XPATH).click()
+        if file_name is None:
+            file_name, download_seconds = wait_for_download(self.download_dir, before_files, REPORT_FILE_PATTERN)
+        self.report_wait_seconds = generation_seconds + download_seconds
+        record_wait_time(self.market, generation_seconds, download_seconds)
+        logger.info(f"Report downloaded successfully: {file_name}")
+        return file_name
+
+    def rename_latest_download(self, file_name=None):
+        """Rename the downloaded report file in this market's download folder.
+
+        Renames file_name, the file collect_download() returned, or the newest
+        CustomTransaction.csv in the folder when it is not given.
+        """
+        folder = self.download_dir
+        if file_name:
+            latest_file = os.path.join(folder, file_name)
+        else:
+            files = [f for f in os.listdir(folder) if f.endswith("CustomTransaction.csv")]
+            if not files:
+                logger.warning("No CustomTransaction.csv file found to rename.")
+                return
+            latest_file = max([os.path.join(folder, f) for f in files], key=os.path.getmtime)
+
+        # Extract date from filename
+        match = re.search(
+            r"(\d{4}[A-Za-z]{3}\d{1,2})-\d{4}[A-Za-z]{3}\d{1,2}CustomTransaction\.csv",
+            os.path.basename(latest_file)
+        )
+        if not match:
+            logger.warning("Filename format doesn't match expected pattern.")
+            return
+
+        date_str = match.group(1)
+        try:
+            date_obj = datetime.strptime(date_str, "%Y%b%d")
+        except ValueError as e:
+            logger.error(f"Date parsing failed: {e}")
+            return
+
+        formatted_date = date_obj.strftime("%Y-%m-%d")
+        new_filename = f"{self.settings['folder']}_sales_{formatted_date}.csv"
+        new_filepath = os.path.join(folder, new_filename)
+
+        os.replace(latest_file, new_filepath)
+        logger.info(f"Renamed file to: {new_filepath}")
+    
+    def append_latest_report_master_file(self):
+        FILE_PATTERN = re.compile(rf"{self.settings['folder']}_sales_\d{{4}}-\d{{2}}-\d{{2}}\.csv")
+        matching_files = [
+            f for f in os.listdir(self.report_folder)
+            if FILE_PATTERN.match(f)
+        ]
+
+        if not matching_files:
+            logger.info("No matching report files found.")
+            return
+
+        matching_files_paths = [os.path.join(self.report_folder, f) for f in matching_files]
+        latest_file = max(matching_files_paths, key=os.path.getmtime)
+        logger.info(f"Latest downloaded file: {latest_file}")
+
+        if self.master_store.append_report(latest_file, skiprows=7):
+            logger.info("Appended latest report to master successfully.")
+
+    def clean_transactions(self, df):
+        """Normalize headers and parse dates and amounts of a block of master rows."""
+        settings = self.settings
+
+        df.columns = df.columns.str.replace(' ', '_').str.replace('/', '_')
+        for char in settings["header_drop_chars"]:
+            df.columns = df.columns.str.replace(char, '')
+        if settings["header_lowercase"]:
+            df.columns = df.columns.str.lower()
+        df.rename(columns=settings["column_map"], inplace=True)
+
+        df["date_time"] = parse_report_timestamps(
+            df["date_time"], settings["date_format"], settings["month_names"], dayfirst=settings["dayfirst"]
+        )
+        df["date"] = df["date_time"].dt.date
+        df["time"] = df["date_time"].dt.time
+        df["weekday"] = df["date_time"].dt.day_name()
+
+        for col in NUMERICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = parse_localized_numbers(df[col], decimal=settings["decimal"], thousands=settings["thousands"])
+
+        encode_categoricals(df)
+        return df[[col for col in OUTPUT_COLUMNS if col in df.columns]]
+
+    def data_cleaning_on_master_file(self, chunk_rows=CHUNK_ROWS):
+        """Clean the master into the sales report. With chunk_rows, stream it in blocks of that many rows."""
+        # Read as text so amounts keep their localized form until parsed;
+        # letting the reader infer types turns '1.500' into 1.5 first.
+        if chunk_rows:
+            daily = clean_master_in_chunks(
+                self.master_store, self.clean_transactions, self.output_file, self.daily_store, chunk_rows, dtype=str
+            )
+        else:
+            df = self.clean_transactions(self.master_store.read(dtype=str))
+            write_sales_report(df, self.output_file)
+            daily = self.daily_store.update(df, self.master_store)
+        logger.info("Cleaned and saved report for sales estimation.")
+        return daily
+
+    def process_download(self, file_name=None):
+        """Rename the downloaded report, append it to the master and clean it. Returns daily sales aggregates."""
+        self.rename_latest_download(file_name)
+        self.append_latest_report_master_file()
+        daily = self.data_cleaning_on_master_file()
+        logger.info(f"{self.market} reports downloaded and processed successfully!")
+        return daily
+
+def run_download(market):
+    """Download yesterday's report for one market, append it to the master and clean it.
+
+    Makes a single attempt and raises when the report is not downloaded in time, so
+    callers decide how often to retry. Returns the refreshed daily sales aggregates.
+    """
+    getreports = MarketplaceReportDownloads(market)
+    with browser_pool.session(EU, getreports.setup_driver) as session:
+        getreports.attach(session)
+        getreports.sign_in()
+        getreports.navigate_to_reports()
+
+        date = datetime.today() - timedelta(days=1)
+        formatted_start_date = formatted_end_date = date.strftime("%m/%d/%Y")
+
+        before_files = set(os.listdir(getreports.download_dir))
+
+        getreports.set_date_range(formatted_start_date, formatted_end_date)
+        getreports.request_report()
+        file_name = getreports.wait_for_report(before_files)
+
+    # The browser is free for the next marketplace while this one is processed.
+    return getreports.process_download(file_name)
+
+
+def run_markets(markets):
+    """Run run_download for each market in turn on the shared EU session. Returns {market: daily} for the ones that succeeded."""
+    results = {}
+    for market in markets:
+        try:
+            results[market] = run_with_retries(
+                lambda: run_download(market), max_attempts=5, delay=3, description=f"the {market} report download"
+            )
+            logger.info(f"{market} report download completed successfully.")
+        except Exception:
+            logger.error(f"Failed to download new {market} report after multiple attempts.")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download and clean EU marketplace transaction reports.")
+    parser.add_argument("--market", action="append", choices=list(MARKETPLACES),
+                        help="Run only this market. Can be given more than once; defaults to all markets.")
+    args = parser.parse_args()
+
+    run_markets(args.market or list(MARKETPLACES))
+    pacing.log_summary()
@@ -0,0 +1,362 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.retry import run_with_retries
+from common.browser_pool import EU
+from common.pacing import pacing
+from common.marketplaces import MARKETPLACES
+from common.report_batch import download_reports_concurrently
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIMINGS_PATH = r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\pipeline_timings.jsonl'
+
+SCRIPTS = {
+    "enzymedica-us-scraper": os.path.join(ROOT_DIR, "scraper", "enzymedica-sales-report-scraper.py"),
+    "enzyme-science-scraper": os.path.join(ROOT_DIR, "scraper", "enzyme-science-scraper.py"),
+    "eu-marketplace-scraper": os.path.join(ROOT_DIR, "scraper", "eu-marketplace-scraper.py"),
+    "us-estimation": os.path.join(ROOT_DIR, "sales-estimation", "sales-estimation.py"),
+    "enzyme-science-estimation": os.path.join(ROOT_DIR, "sales-estimation", "enzyme-science-sales-estimation.py"),
+    "eu-estimation": os.path.join(ROOT_DIR, "sales-estimation", "eu-sales-estimation.py"),
+    "panel-estimation": os.path.join(ROOT_DIR, "sales-estimation", "panel-sales-estimation.py"),
+    "result-email": os.path.join(ROOT_DIR, "sales-estimation", "result-email.py"),
+    "s3-upload": os.path.join(ROOT_DIR, "uploads", "s3-uploads.py"),
+}
+
+EU_COUNTRIES = list(MARKETPLACES)
+EU_SCRAPER_STAGES = [f"{country.lower()}-scraper" for country in EU_COUNTRIES]
+
+_loaded_scripts = {}
+# Stages on different threads may ask for the same script at once.
+_load_lock = threading.RLock()
+
+
+def load_script(name):
+    """Import a pipeline script once per process, even though its file name has dashes."""
+    with _load_lock:
+        if name not in _loaded_scripts:
+            module_name = name.replace("-", "_")
+            spec = importlib.util.spec_from_file_location(module_name, SCRIPTS[name])
+            module = importlib.util.module_from_spec(spec)
+            # Registered so worker processes can unpickle classes defined in the script.
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+            _loaded_scripts[name] = module
+        return _loaded_scripts[name]
+
+
+# Each stage receives the shared context and leaves its in-memory output there
+# for downstream stages, so nothing is re-read from disk within one run. Stages
+# may run on different threads, so each one writes only its own keys.
+
+def enzymedica_us_scraper(context):
+    return load_script("enzymedica-us-scraper").run_download()
+
+
+def enzyme_science_scraper(context):
+    return load_script("enzyme-science-scraper").run_download()
+
+
+def eu_scraper(country):
+    def stage(context):
+        daily = load_script("eu-marketplace-scraper").run_download(country)
+        context["eu_daily"][country] = daily
+        return daily
+    return stage
+
+
+def eu_batch_scraper(context):
+    # Countries already downloaded by an earlier attempt are not requested again.
+    remaining = [country for country in EU_COUNTRIES if country not in context["eu_daily"]]
+    engine = load_script("eu-marketplace-scraper")
+    scrapers = {country: engine.MarketplaceReportDownloads(country) for country in remaining}
+    report_date = (datetime.today() - timedelta(days=1)).strftime("%m/%d/%Y")
+    timeout = engine.CONFIG["report_timeout"]
+    downloaded = download_reports_concurrently(EU, scrapers, report_date, report_date, timeout=timeout)
+    for country, file_name in downloaded.items():
+        context["eu_daily"][country] = scrapers[country].process_download(file_name)
+
+    missing = [country for country in remaining if country not in downloaded]
+    if missing:
+        raise RuntimeError(f"No report downloaded for: {', '.join(missing)}")
+    return context["eu_daily"]
+
+
+def us_estimation(context):
+    estimator = load_script("us-estimation").SalesEstimation()
+    estimator.append_latest_report_master_file()
+    daily = estimator.data_cleaning_on_master_file()
+    result = estimator.sales_estimation(selected_date=datetime.today().day, daily=daily)
+    context["results"]["us-estimation"] = [result]
+    return result
+
+
+def enzyme_science_estimation(context):
+    estimator = load_script("enzyme-science-estimation").SalesEstimation()
+    estimator.append_latest_report_master_file()
+    daily = estimator.data_cleaning_on_master_file()
+    result = estimator.sales_estimation(selected_date=datetime.today().day, daily=daily)
+    context["results"]["enzyme-science-estimation"] = [result]
+    return result
+
+
+def market_cleaning(script, market):
+    def stage(context):
+        estimator = load_script(script).SalesEstimation()
+        estimator.append_latest_report_master_file()
+        daily = estimator.data_cleaning_on_master_file()
+        context["market_daily"][market] = daily
+        return daily
+    return stage
+
+
+def panel_estimation(context):
+    estimator = load_script("panel-estimation").SalesEstimation()
+    estimator.daily_by_market = {
+        **context["market_daily"],
+        **{f"Enzymedica EU - {country}": daily for country, daily in context["eu_daily"].items()},
+    }
+    results = estimator.panel_sales_estimation(selected_date=datetime.today().day)
+    context["results"]["panel-estimation"] = results
+    return results
+
+
+def us_sku_estimation(context):
+    return load_script("us-estimation").SalesEstimation().sku_estimation(selected_date=datetime.today().day)
+
+
+def enzyme_science_sku_estimation(context):
+    return load_script("enzyme-science-estimation").SalesEstimation().sku_estimation(selected_date=datetime.today().day)
+
+
+def eu_estimation(context):
+    estimator = load_script("eu-estimation").SalesEstimation()
+    estimator.daily_by_country = context.get("eu_daily", {})
+    results = estimator.multi_country_sales_estimation(selected_date=datetime.today().day)
+    context["results"]["eu-estimation"] = results
+    return results
+
+
+def result_email(context):
+    # Only use in-memory results when every market was estimated in this run,
+    # otherwise the email falls back to the results store.
+    sales_data = None
+    report_date_key = (datetime.today() - timedelta(days=1)).strftime("%Y-%m-%d")
+    if all(stage in context["results"] for stage in ESTIMATION_STAGES):
+        sales_data = {report_date_key: [r for stage in ESTIMATION_STAGES for r in context["results"][stage]]}
+    elif len(context["results"].get("panel-estimation", [])) == len(load_script("panel-estimation").MARKETS):
+        sales_data = {report_date_key: context["results"]["panel-estimation"]}
+    return load_script("result-email").send_sales_summary_email(sales_data)
+
+
+def s3_upload(context):
+    uploader = load_script("s3-upload").S3Uploader()
+    success = uploader.upload_all_reports_to_s3()
+    uploader.close_s3_client()
+    if not success:
+        logger.error("File upload process failed.")
+    return success
+
+
+STAGES = {
+    "enzymedica-us-scraper": enzymedica_us_scraper,
+    "enzyme-science-scraper": enzyme_science_scraper,
+    **{stage: eu_scraper(country) for stage, country in zip(EU_SCRAPER_STAGES, EU_COUNTRIES)},
+    "eu-batch-scraper": eu_batch_scraper,
+    "us-estimation": us_estimation,
+    "enzyme-science-estimation": enzyme_science_estimation,
+    "eu-estimation": eu_estimation,
+    "us-cleaning": market_cleaning("us-estimation", "Enzymedica US"),
+    "enzyme-science-cleaning": market_cleaning("enzyme-science-estimation", "Enzyme Science US"),
+    "panel-estimation": panel_estimation,
+    "us-sku-estimation": us_sku_estimation,
+    "enzyme-science-sku-estimation": enzyme_science_sku_estimation,
+    "result-email": result_email,
+    "s3-upload": s3_upload,
+}
+
+SCRAPER_STAGES = ["enzymedica-us-scraper", "enzyme-science-scraper"] + EU_SCRAPER_STAGES
+# Same scrapes, but the EU reports are requested together in one session.
+EU_BATCH_SCRAPER_STAGES = ["enzymedica-us-scraper", "enzyme-science-scraper", "eu-batch-scraper"]
+ESTIMATION_STAGES = ["us-estimation", "enzyme-science-estimation", "eu-estimation"]
+# Per-SKU forecasts for the category managers, written to sku_results.csv.
+SKU_ESTIMATION_STAGES = ["us-sku-estimation", "enzyme-science-sku-estimation"]
+REPORTING_STAGES = ESTIMATION_STAGES + SKU_ESTIMATION_STAGES + ["result-email", "s3-upload"]
+# Same reports, but every market is estimated together from one stacked daily
+# panel once the US masters are cleaned.
+PANEL_ESTIMATION_STAGES = ["us-cleaning", "enzyme-science-cleaning", "panel-estimation"]
+PANEL_REPORTING_STAGES = PANEL_ESTIMATION_STAGES + SKU_ESTIMATION_STAGES + ["result-email", "s3-upload"]
+
+# Upstream stages each stage waits for. Dependencies on stages that are not
+# part of the current run are ignored, so any subset can be run on its own.
+DEPENDENCIES = {
+    "panel-estimation": ["us-cleaning", "enzyme-science-cleaning"],
+    "us-sku-estimation": ["us-estimation", "us-cleaning"],
+    "enzyme-science-sku-estimation": ["enzyme-science-estimation", "enzyme-science-cleaning"],
+    "result-email": ESTIMATION_STAGES + ["panel-estimation"],
+    "s3-upload": ESTIMATION_STAGES + ["panel-estimation"],
+}
+
+# Upstream stages a stage waits for but still runs after when they fail. The
+# estimators pick up whatever reports did download and fall back to the
+# masters on disk for the rest, so a failed scrape never holds back the
+# nightly email and upload.
+AFTER = {
+    "us-estimation": ["enzymedica-us-scraper"],
+    "enzyme-science-estimation": ["enzyme-science-scraper"],
+    "eu-estimation": EU_SCRAPER_STAGES + ["eu-batch-scraper"],
+    "us-cleaning": ["enzymedica-us-scraper"],
+    "enzyme-science-cleaning": ["enzyme-science-scraper"],
+    "panel-estimation": EU_SCRAPER_STAGES + ["eu-batch-scraper"],
+}
+
+# (max_attempts, seconds between attempts), matching each scraper's own
+# retry loop when run on its own. Stages not listed run once.
+RETRIES = {
+    "enzymedica-us-scraper": (5, 0),
+    "enzyme-science-scraper": (5, 0),
+    **{stage: (5, 3) for stage in EU_SCRAPER_STAGES},
+    "eu-batch-scraper": (3, 3),
+}
+
+# Stages sharing a lock never run at the same time. The per-SKU stages
+# rewrite sku_results.csv, so they take turns; the estimators append to the
+# results store, which locks its own writes. Scrapers in one Seller Central
+# region already take turns on the shared browser session.
+LOCKS = {
+    **{stage: "sku-results" for stage in SKU_ESTIMATION_STAGES},
+}
+
+
+class PipelineRunner:
+    """Runs pipeline stages in this process as a dependency graph.
+
+    A stage starts as soon as all of its upstream stages in this run have
+    succeeded and its AFTER stages have finished, so independent markets
+    scrape concurrently. When a stage fails after its retries, everything that
+    depends on it is skipped while unrelated stages carry on. Per-stage
+    timings are recorded for every run.
+    """
+
+    def __init__(self, stages, max_workers=6):
+        self.stages = stages
+        self.max_workers = max_workers
+        self.context = {"results": {}, "eu_daily": {}, "market_daily": {}}
+        self.timings = []
+        self.locks = {name: threading.Lock() for name in set(LOCKS.values())}
+
+    def upstream(self, name):
+        return [dep for dep in DEPENDENCIES.get(name, []) if dep in self.stages]
+
+    def after(self, name):
+        return [dep for dep in AFTER.get(name, []) if dep in self.stages]
+
+    def run_stage(self, name):
+        max_attempts, delay = RETRIES.get(name, (1, 0))
+        lock = self.locks.get(LOCKS.get(name))
+        start = time.perf_counter()
+        attempts = 0
+
+        def attempt():
+            nonlocal attempts
+            attempts += 1
+            if lock is None:
+                return STAGES[name](self.context)
+            with lock:
+                return STAGES[name](self.context)
+
+        try:
+            run_with_retries(attempt, max_attempts=max_attempts, delay=delay, description=f"stage {name}")
+            status = "success"
+        except Exception as e:
+            logger.error(f"Stage {name} failed: {e}")
+            status = "failed"
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Stage {name} finished in {elapsed:.2f}s ({status})")
+        return {"stage": name, "seconds": round(elapsed, 2), "attempts": attempts, "status": status}
+
+    def run(self):
+        started_at = datetime.now().isoformat(timespec='seconds')
+        status = {}
+        pending = list(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name in list(pending):
+                    upstream = [status.get(dep) for dep in self.upstream(name)]
+                    if any(s in ("failed", "skipped") for s in upstream):
+                        logger.warning(f"Skipping stage {name} because an upstream stage did not succeed.")
+                        status[name] = "skipped"
+                        self.timings.append({"stage": name, "seconds": 0.0, "attempts": 0, "status": "skipped"})
+                        pending.remove(name)
+                    elif all(s == "success" for s in upstream) and all(dep in status for dep in self.after(name)):
+                        logger.info(f"Running stage: {name}")
+                        running[pool.submit(self.run_stage, name)] = name
+                        pending.remove(name)
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    timing = future.result()
+                    status[running.pop(future)] = timing["status"]
+                    self.timings.append(timing)
+
+        self.record_timings(started_at)
+        return all(s == "success" for s in status.values())
+
+    def record_timings(self, started_at):
+        """Append this run's per-stage timings and scraper pacing totals as one JSON line."""
+        logger.info("Stage timings: " + ", ".join(f"{t['stage']}={t['seconds']:.2f}s ({t['status']})" for t in self.timings))
+        pacing.log_summary()
+        try:
+            with open(TIMINGS_PATH, 'a') as f:
+                f.write(json.dumps({"started_at": started_at, "stages": self.timings, "pacing": pacing.summary()}) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not record stage timings: {e}")
+
+
+if __name__ == "__main__":
+    env_path = r'C:\Users\d.tanubudhi\amazon_sales_estimation\.env'
+    load_dotenv(dotenv_path=env_path)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(r'C:\Users\d.tanubudhi\amazon_sales_estimation\logs\pipeline_process.log', encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+    parser = argparse.ArgumentParser(description="Run the nightly sales estimation pipeline in one process.")
+    parser.add_argument("--workers", type=int, default=6, help="Maximum number of stages running at once.")
+    parser.add_argument("--stage", action="append", choices=list(STAGES),
+                        help="Run only this stage. Can be given more than once.")
+    parser.add_argument("--eu-batch", action="store_true",
+                        help="Request all EU reports at once instead of one country after another.")
+    parser.add_argument("--panel", action="store_true",
+                        help="Estimate every market in one panel stage instead of one estimator per market.")
+    parser.add_argument("--list", action="store_true", help="List the available stages and exit.")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(STAGES))
+    else:
+        scraper_stages = EU_BATCH_SCRAPER_STAGES if args.eu_batch else SCRAPER_STAGES
+        reporting_stages = PANEL_REPORTING_STAGES if args.panel else REPORTING_STAGES
+        stages = args.stage or scraper_stages + reporting_stages
+        sys.exit(0 if PipelineRunner(stages, max_workers=args.workers).run() else 1)
@@ -1,22 +1,16 @@
 import re
 import sys
 import boto3
-import logging
 from datetime import datetime
 from dotenv import load_dotenv
 import os
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.script_logging import configure_script_logging
+
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(r"C:\Users\d.tanubudhi\amazon_sales_estimation\logs\s3-uploads.log", encoding="utf-8"),
-        logging.StreamHandler(sys.stdout),
-    ],
-)
-logger = logging.getLogger(__name__)
+logger = configure_script_logging(__name__, r"C:\Users\d.tanubudhi\amazon_sales_estimation\logs\s3-uploads.log", sys.stdout)
 
 
 class S3Uploader:
@@ -82,30 +76,75 @@ class S3Uploader:
         else:
             logger.info(f"Folder already exists: {s3_prefix}")
 
+    def upload_file(self, file, s3_key):
+        """Upload one local file to s3_key. Returns True on success."""
+        try:
+            logger.info(f"Uploading {file} to s3://{self.bucket_name}/{s3_key}")
+            self.s3_client.upload_file(str(file), self.bucket_name, s3_key)
+            logger.info(f"Successfully uploaded: {s3_key}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to upload {file}: {e}")
+            return False
+
+    def remove_stale_objects(self, s3_prefix, keep_keys):
+        """Delete objects under s3_prefix that are not in keep_keys, e.g. partition files of an older dataset write."""
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        stale = [
+            {"Key": obj["Key"]}
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=s3_prefix)
+            for obj in page.get("Contents", [])
+            if obj["Key"] not in keep_keys
+        ]
+        for i in range(0, len(stale), 1000):
+            self.s3_client.delete_objects(Bucket=self.bucket_name, Delete={"Objects": stale[i:i + 1000]})
+        if stale:
+            logger.info(f"Removed {len(stale)} stale objects under {s3_prefix}")
+
     def upload_all_reports_to_s3(self):
-        """Upload all files in the directory to S3 under base_s3_path root (flat structure)."""
+        """Upload all reports in the directory to S3 under base_s3_path root.
+
+        Files go up flat as before. Parquet report datasets are directories, so
+        their files go up under the dataset name with their partition folders,
+        replacing the dataset's previous upload.
+        """
         local_path = Path(self.local_files_dir)
         if not local_path.exists() or not local_path.is_dir():
             logger.error(f"Local directory does not exist: {self.local_files_dir}")
             return False
 
         s3_prefix = f"{self.base_s3_path}/"
-        report_files = [f for f in local_path.iterdir() if f.is_file()]
-        
-        if not report_files:
+        # ".tmp" entries are reports still being written.
+        entries = [f for f in local_path.iterdir() if not f.name.endswith(".tmp")]
+        report_files = [f for f in entries if f.is_file()]
+        report_datasets = [f for f in entries if f.is_dir()]
+
+        if not report_files and not report_datasets:
             logger.warning(f"No files found in directory: {local_path}")
             return False
 
         all_success = True
 
         for file in report_files:
-            s3_key = f"{s3_prefix}{file.name}"
+            if not self.upload_file(file, f"{s3_prefix}{file.name}"):
+                all_success = False
+
+        for dataset in report_datasets:
+            dataset_keys = set()
+            dataset_success = True
+            for file in sorted(f for f in dataset.rglob("*") if f.is_file()):
+                s3_key = f"{s3_prefix}{file.relative_to(local_path).as_posix()}"
+                dataset_keys.add(s3_key)
+                if not self.upload_file(file, s3_key):
+                    dataset_success = False
+
+            if not dataset_success:
+                all_success = False
+                continue
             try:
-                logger.info(f"Uploading {file} to s3://{self.bucket_name}/{s3_key}")
-                self.s3_client.upload_file(str(file), self.bucket_name, s3_key)
-                logger.info(f"Successfully uploaded: {file.name}")
+                self.remove_stale_objects(f"{s3_prefix}{dataset.name}/", dataset_keys)
             except Exception as e:
-                logger.error(f"Failed to upload {file.name}: {e}")
+                logger.error(f"Failed to remove stale objects of {dataset.name}: {e}")
                 all_success = False
 
         return all_success